@@ -0,0 +1,109 @@
+"""
+Synthetic APRS corpora shared by the benchmarks.
+
+The corpora are generated from a fixed seed, so every run (and every
+version being compared) decodes exactly the same bytes.
+"""
+import random
+
+import pytest
+
+from ax253 import Frame
+from ax253.fcs import FCS
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+pytest.importorskip("pytest_benchmark")
+
+SEED = 253
+CORPUS_SIZE = 5000
+# a busy APRS-IS feed repeats a few hundred stations
+STATIONS = 400
+
+DESTINATIONS = ["APRS", "APDW16", "APN391", "APMI06", "APK004", "BEACON", "T2QS1R"]
+PATHS = [
+    [],
+    ["WIDE1-1"],
+    ["WIDE1-1", "WIDE2-1"],
+    ["WIDE2-2"],
+    ["N7QXO-9", "WIDE2-1"],
+    ["WIDE1-1", "WIDE2-1", "QAR", "KG7ZZA-10"],
+]
+INFO_FORMATS = [
+    "!{lat:04d}.{n:02d}N/{lon:05d}.{n:02d}W-PHG{n:02d}51/A={alt:06d} station {n}",
+    "={lat:04d}.{n:02d}N/{lon:05d}.{n:02d}W_{n:03d}/{n:03d}g005t077r000p000h50b09900",
+    ">Status message number {n}",
+    "T#{n:03d},{n:03d},{alt:03d},087,046,080,00010011",
+    ":BLN{d}     :Bulletin {n} for the net",
+    '`{n:02d}5l #>/`"4(}}_%',
+]
+
+
+def _random_frame(rng: random.Random, stations) -> Frame:
+    fmt = rng.choice(INFO_FORMATS)
+    info = fmt.format(
+        lat=rng.randrange(1000, 8999),
+        lon=rng.randrange(1000, 17999),
+        alt=rng.randrange(1000),
+        n=rng.randrange(100),
+        d=rng.randrange(10),
+    )
+    return Frame.ui(
+        destination=rng.choice(DESTINATIONS),
+        source=rng.choice(stations),
+        path=rng.choice(PATHS),
+        info=info.encode("latin1"),
+    )
+
+
+def _flagged(raw: bytes) -> bytes:
+    return b"~" + raw + FCS.compute(raw) + b"~"
+
+
+@pytest.fixture(scope="session")
+def corpus():
+    """Frames of typical APRS traffic; no encoded frame contains a flag."""
+    rng = random.Random(SEED)
+    stations = [
+        "{}{}{}-{}".format(
+            rng.choice(["K", "N", "W", "KF", "KG", "VE"]),
+            rng.randrange(10),
+            "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(3)),
+            rng.choice([0, 0, 0, 1, 7, 9, 10, 15]),
+        ).replace("-0", "")
+        for _ in range(STATIONS)
+    ]
+    frames = []
+    while len(frames) < CORPUS_SIZE:
+        frame = _random_frame(rng, stations)
+        # raw captures are not bit stuffed, so skip frames a flag would split
+        if b"~" not in _flagged(bytes(frame))[1:-1]:
+            frames.append(frame)
+    return frames
+
+
+@pytest.fixture(scope="session")
+def ax25_corpus(corpus):
+    """Each frame of the corpus encoded as AX.25, without FCS."""
+    return [bytes(frame) for frame in corpus]
+
+
+@pytest.fixture(scope="session")
+def ax25_stream(ax25_corpus):
+    """The corpus as a flag delimited stream with FCS."""
+    return b"".join(_flagged(raw) for raw in ax25_corpus)
+
+
+@pytest.fixture(scope="session")
+def tnc2_corpus(corpus):
+    """Each frame of the corpus as a TNC2 line, without line ending."""
+    return [str(frame).encode("latin1") for frame in corpus]
+
+
+@pytest.fixture(scope="session")
+def tnc2_stream(tnc2_corpus):
+    """The corpus as CR-LF delimited TNC2."""
+    return b"".join(line + b"\r\n" for line in tnc2_corpus)
@@ -0,0 +1,49 @@
+"""Address encode and decode."""
+import pytest
+
+from ax253 import address, Address
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+@pytest.fixture(scope="module")
+def encoded_addresses(ax25_corpus):
+    """Every address field of the corpus, 7 bytes each."""
+    return [
+        raw[start : start + 7]
+        for raw in ax25_corpus
+        for start in range(0, raw.index(b"\x03\xf0"), 7)
+    ]
+
+
+@pytest.fixture(params=[address.DEFAULT_CACHE_SIZE, 0], ids=["interned", "uncached"])
+def cache_size(request):
+    address.set_cache_size(request.param)
+    yield request.param
+    address.set_cache_size()
+
+
+def test_address_from_bytes(benchmark, cache_size, encoded_addresses):
+    result = benchmark(lambda: [Address.from_bytes(a) for a in encoded_addresses])
+    assert len(result) == len(encoded_addresses)
+
+
+def test_address_bytes(benchmark, encoded_addresses):
+    def setup():
+        # new instances, so the memoized encoding is not reused between rounds
+        return ([Address._from_bytes(a) for a in encoded_addresses],), {}
+
+    benchmark.pedantic(
+        lambda addresses: [bytes(a) for a in addresses], setup=setup, rounds=20
+    )
+
+
+def test_address_from_str(benchmark, cache_size, tnc2_corpus):
+    specs = [
+        spec.decode("latin1")
+        for line in tnc2_corpus
+        for spec in line.partition(b":")[0].replace(b">", b",").split(b",")
+    ]
+    benchmark(lambda: [Address.from_str(s) for s in specs])
@@ -0,0 +1,83 @@
+"""Stream decoders, fed the way a socket or file delivers data."""
+import pytest
+
+from ax253 import AX25BytestreamDecoder, Frame, TNC2Decode, TNC2Writer
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+CHUNK_SIZES = [64, 1024, 64 * 1024]
+# a serial TNC can hand over a single byte per read
+AX25_CHUNK_SIZES = [1] + CHUNK_SIZES
+# documented target for TNC2Decode, see ax253.tnc2.frame_from_tnc2
+TNC2_LINES_PER_SECOND = 100000
+
+
+def split(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def decode_all(decoder, reads):
+    frames = []
+    for data in reads:
+        frames.extend(decoder.update(data))
+    frames.extend(decoder.flush())
+    return frames
+
+
+@pytest.mark.parametrize("chunk_size", AX25_CHUNK_SIZES)
+def test_ax25_decoder_update(benchmark, chunk_size, corpus, ax25_stream):
+    reads = split(ax25_stream, chunk_size)
+    frames = benchmark(lambda: decode_all(AX25BytestreamDecoder(), reads))
+    assert frames == corpus
+    if benchmark.stats:
+        # comparable across chunk sizes; ideally flat
+        bytes_per_second = len(ax25_stream) / benchmark.stats.stats.mean
+        benchmark.extra_info["bytes_per_second"] = round(bytes_per_second)
+
+
+@pytest.mark.parametrize("chunk_size", AX25_CHUNK_SIZES)
+def test_ax25_decoder_update_lazy(benchmark, chunk_size, ax25_stream):
+    reads = split(ax25_stream, chunk_size)
+    benchmark(lambda: decode_all(AX25BytestreamDecoder(lazy=True), reads))
+
+
+def test_ax25_decoder_update_bulk(benchmark, corpus, ax25_stream):
+    assert benchmark(
+        lambda: list(AX25BytestreamDecoder().update_bulk(ax25_stream))
+    ) == (corpus)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_tnc2_decoder_update(benchmark, chunk_size, corpus, tnc2_stream):
+    reads = split(tnc2_stream, chunk_size)
+    frames = benchmark(lambda: decode_all(TNC2Decode(), reads))
+    assert frames == corpus
+    if benchmark.stats:
+        lines_per_second = len(corpus) / benchmark.stats.stats.mean
+        benchmark.extra_info["lines_per_second"] = round(lines_per_second)
+        benchmark.extra_info["target_lines_per_second"] = TNC2_LINES_PER_SECOND
+
+
+class CountingSink:
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+
+
+def test_tnc2_writer(benchmark, ax25_corpus, tnc2_stream):
+    def setup():
+        # new frames, so no encoding is memoized yet
+        return ([Frame.from_bytes(raw) for raw in ax25_corpus],), {}
+
+    def write(frames):
+        sink = CountingSink()
+        with TNC2Writer(sink) as writer:
+            writer.write_many(frames)
+        return sink.size
+
+    assert benchmark.pedantic(write, setup=setup, rounds=20) == len(tnc2_stream)
@@ -0,0 +1,35 @@
+"""FCS throughput for each backend."""
+import pytest
+
+from ax253 import fcs
+from ax253.fcs import FCS
+from ax253.frame import find_frame_spans
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+@pytest.fixture(params=sorted(fcs.BACKENDS))
+def backend(request):
+    previous = fcs.BACKEND
+    fcs.select_backend(request.param)
+    yield request.param
+    fcs.select_backend(previous)
+
+
+def test_fcs_update(benchmark, backend, ax25_corpus):
+    def _():
+        for raw in ax25_corpus:
+            FCS().update(raw)
+
+    benchmark(_)
+
+
+def test_fcs_compute(benchmark, backend, ax25_corpus):
+    benchmark(lambda: [FCS.compute(raw) for raw in ax25_corpus])
+
+
+def test_fcs_verify_spans(benchmark, backend, ax25_stream):
+    starts, ends = find_frame_spans(ax25_stream)
+    assert all(benchmark(FCS.verify_spans, ax25_stream, starts, ends))
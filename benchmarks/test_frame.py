@@ -0,0 +1,36 @@
+"""Frame encode and decode."""
+from ax253 import Frame
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+def test_frame_from_bytes(benchmark, corpus, ax25_corpus):
+    assert benchmark(lambda: [Frame.from_bytes(raw) for raw in ax25_corpus]) == corpus
+
+
+def test_frame_from_bytes_lazy(benchmark, ax25_corpus):
+    benchmark(lambda: [Frame.from_bytes(raw, lazy=True) for raw in ax25_corpus])
+
+
+def test_frame_bytes(benchmark, ax25_corpus):
+    def setup():
+        # new frames, so the memoized encoding is not reused between rounds
+        return ([Frame.from_bytes(raw) for raw in ax25_corpus],), {}
+
+    benchmark.pedantic(
+        lambda frames: [bytes(f) for f in frames], setup=setup, rounds=20
+    )
+
+
+def test_frame_from_str(benchmark, corpus, tnc2_corpus):
+    lines = [line.decode("latin1") for line in tnc2_corpus]
+    assert benchmark(lambda: [Frame.from_str(line) for line in lines]) == corpus
+
+
+def test_frame_str(benchmark, ax25_corpus):
+    def setup():
+        return ([Frame.from_bytes(raw) for raw in ax25_corpus],), {}
+
+    benchmark.pedantic(lambda frames: [str(f) for f in frames], setup=setup, rounds=20)
@@ -0,0 +1,44 @@
+"""FrameDecodeProtocol end to end over a local socketpair."""
+import asyncio
+import socket
+
+import pytest
+
+from ax253 import AX25BytestreamDecoder, FrameDecodeProtocol, TNC2Protocol
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+def receive_all(protocol_factory, stream):
+    """Send the stream through a socketpair and read every frame."""
+
+    async def _():
+        loop = asyncio.get_running_loop()
+        ours, theirs = socket.socketpair()
+        theirs.setblocking(False)
+        _, protocol = await loop.create_connection(protocol_factory, sock=ours)
+        sender = loop.create_task(loop.sock_sendall(theirs, stream))
+        sender.add_done_callback(lambda _: theirs.close())
+        frames = [f async for f in protocol.read()]
+        await sender
+        return frames
+
+    return asyncio.run(_())
+
+
+PROTOCOLS = {
+    "ax25": lambda: FrameDecodeProtocol(decoder=AX25BytestreamDecoder()),
+    "ax25-lazy": lambda: FrameDecodeProtocol(decoder=AX25BytestreamDecoder(lazy=True)),
+    "tnc2": TNC2Protocol,
+}
+
+
+@pytest.mark.parametrize("kind", sorted(PROTOCOLS))
+def test_protocol_socketpair(benchmark, kind, corpus, ax25_stream, tnc2_stream):
+    stream = tnc2_stream if kind == "tnc2" else ax25_stream
+    frames = benchmark.pedantic(
+        receive_all, args=(PROTOCOLS[kind], stream), rounds=10, warmup_rounds=1
+    )
+    assert frames == corpus
@@ -1,9 +1,12 @@
 from importlib_metadata import version
 
 from .address import Address
+from .batch import FrameBatch
+from .capture import CaptureReader
 from .decode import GenericDecoder, FrameDecodeProtocol, SyncFrameDecode
-from .frame import AX25BytestreamDecoder, Control, Frame, FrameType
-from .tnc2 import TNC2Protocol, TNC2Decode
+from .frame import AX25BytestreamDecoder, Control, Frame, FrameType, LazyFrame
+from .hub import FrameHub
+from .tnc2 import TNC2Protocol, TNC2Decode, TNC2Writer
 
 __author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
 __copyright__ = "Copyright 2022 Masen Furer and Contributors"
@@ -13,14 +16,19 @@ __version__ = version(__distribution__)
 __all__ = [
     "Address",
     "AX25BytestreamDecoder",
+    "CaptureReader",
     "Control",
     "Frame",
+    "FrameBatch",
     "FrameDecodeProtocol",
+    "FrameHub",
     "FrameType",
     "GenericDecoder",
+    "LazyFrame",
     "SyncFrameDecode",
     "TNC2Decode",
     "TNC2Protocol",
+    "TNC2Writer",
     "__distribution__",
     "__version__",
 ]
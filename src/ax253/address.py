@@ -1,11 +1,11 @@
 """AX.25 address encode/decode"""
+import functools
 import re
-from typing import Any, Union
+from typing import Any, Dict, Optional, Union
 
 import attr.validators
 from attrs import define, field
 from attr import validators
-from bitarray import bitarray
 
 
 __author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
@@ -14,6 +14,16 @@ __license__ = "Apache License, Version 2.0"
 
 
 VALID_CALLSIGN_REX = re.compile(rb"^[A-Z0-9]+$")
+# Callsign characters are stored shifted left one bit in the address field.
+_SHIFT_LEFT = bytes((b << 1) & 0xFF for b in range(256))
+_SHIFT_RIGHT = bytes(b >> 1 for b in range(256))
+# Bits of the SSID byte (the 7th address byte).
+A7_C_OR_H = 0x80
+A7_RESERVED = 0x60
+A7_SSID = 0x1E
+A7_HLDC = 0x01
+# Number of distinct addresses interned by each of the decode caches.
+DEFAULT_CACHE_SIZE = 1024
 
 
 def valid_callsign(instance, attribute, value):
@@ -34,25 +44,32 @@ class Address:
     """If true, indicates that this address has digipeated the packet."""
     # The high order bit of HLDC; True indicates end of address information.
     a7_hldc: bool = field(default=False, converter=bool, repr=False)
+    # Encodings are memoized on first use; the instance is frozen so they
+    # can never go stale.
+    _encoded: Optional[bytes] = field(default=None, init=False, eq=False, repr=False)
+    _tnc2: Optional[str] = field(default=None, init=False, eq=False, repr=False)
+    _tnc2_bytes: Optional[bytes] = field(default=None, init=False, eq=False, repr=False)
 
     @classmethod
     def from_bytes(cls, ax25_address: bytes, **kwargs: Any) -> "Address":
         """Create an address from ax25 bytes."""
+        if cls is Address and not kwargs:
+            return _cached_from_bytes(bytes(ax25_address))
+        return cls._from_bytes(ax25_address, **kwargs)
+
+    @classmethod
+    def _from_bytes(cls, ax25_address: bytes, **kwargs: Any) -> "Address":
         if len(ax25_address) != 7:
             raise ValueError(
                 "ax25 address must be 7 bytes, got {}".format(len(ax25_address))
             )
-        callsign = bytes(b >> 1 for b in ax25_address[:6]).rstrip()
-        ssid = (ax25_address[6] >> 1) & 0x0F
-        a7 = bitarray()
-        a7.frombytes(ax25_address[6:7])
-        c_or_h = a7[0]
-        r = a7[1:3]  # noqa: F841
-        hldc = a7[7]
+        callsign = bytes(ax25_address[:6]).translate(_SHIFT_RIGHT).rstrip()
+        a7 = ax25_address[6]
+        hldc = bool(a7 & A7_HLDC)
         init_kwargs = dict(
             callsign=callsign,
-            ssid=ssid,
-            digi=c_or_h if hldc else False,
+            ssid=(a7 & A7_SSID) >> 1,
+            digi=bool(a7 & A7_C_OR_H) if hldc else False,
             a7_hldc=hldc,
         )
         if kwargs:
@@ -64,6 +81,17 @@ class Address:
         cls, address_spec: str, a7_hldc: bool = False, **kwargs: Any,
     ) -> "Address":
         """Create an address from a string (TNC2 format)."""
+        if cls is Address and not kwargs:
+            return _cached_from_str(address_spec, a7_hldc)
+        return cls._from_str(address_spec, a7_hldc, **kwargs)
+
+    @classmethod
+    def _from_str(
+        cls,
+        address_spec: str,
+        a7_hldc: bool = False,
+        **kwargs: Any,
+    ) -> "Address":
         digi = "*" in address_spec
         address = address_spec.strip("*")
         callsign_str, found, ssid_str = address.partition("-")
@@ -80,6 +108,18 @@ class Address:
             init_kwargs.update(**kwargs)
         return cls(**init_kwargs)
 
+    @classmethod
+    def _from_tnc2(cls, address_spec: bytes, a7_hldc: bool = False) -> "Address":
+        """Like _from_str, but parse latin1 TNC2 bytes without decoding them."""
+        digi = b"*" in address_spec
+        callsign, found, ssid = address_spec.strip(b"*").partition(b"-")
+        return cls(
+            callsign=callsign,
+            ssid=int(ssid) if ssid else 0,
+            digi=digi,
+            a7_hldc=digi or a7_hldc,
+        )
+
     @classmethod
     def from_any(
         cls, address: Union["Address", bytes, str], **kwargs: Any,
@@ -95,7 +135,9 @@ class Address:
 
     def __str__(self) -> str:
         """Encode address as TNC2 string."""
-        return "".join(
+        if self._tnc2 is not None:
+            return self._tnc2
+        tnc2 = "".join(
             [
                 self.callsign.decode("latin1"),
                 # Append SSID if non-zero
@@ -104,21 +146,69 @@ class Address:
                 "*" if self.digi else "",
             ]
         )
+        object.__setattr__(self, "_tnc2", tnc2)
+        return tnc2
+
+    def _encode_tnc2(self) -> bytes:
+        """Encode address as TNC2 latin1 bytes."""
+        if self._tnc2_bytes is None:
+            object.__setattr__(self, "_tnc2_bytes", str(self).encode("latin1"))
+        return self._tnc2_bytes
 
     def __bytes__(self) -> bytes:
         """Encode address as ax25 bytes."""
+        if self._encoded is not None:
+            return self._encoded
         if len(self.callsign) > 6:
             raise ValueError(
                 "Cannot encode callsign > 6 bytes: {}".format(self.callsign)
             )
-        callsign = bytes(b << 1 for b in self.callsign.ljust(6))
-        a7 = bitarray()
-        a7.frombytes(bytes([self.ssid << 1]))
-        a7[0] = self.digi and self.a7_hldc
-        a7[1:3] = True  # r
-        a7[7] = self.a7_hldc
-        return callsign + a7.tobytes()
+        a7 = ((self.ssid << 1) & A7_SSID) | A7_RESERVED
+        if self.a7_hldc:
+            a7 |= A7_HLDC
+            if self.digi:
+                a7 |= A7_C_OR_H
+        encoded = self.callsign.ljust(6).translate(_SHIFT_LEFT) + bytes([a7])
+        object.__setattr__(self, "_encoded", encoded)
+        return encoded
 
     def evolve(self, **kwargs) -> "Address":
         """Create a new Address by applying kwargs to this Address."""
         return attr.evolve(self, **kwargs)
+
+
+_cached_from_bytes = functools.lru_cache(DEFAULT_CACHE_SIZE)(Address._from_bytes)
+_cached_from_str = functools.lru_cache(DEFAULT_CACHE_SIZE)(Address._from_str)
+_cached_from_tnc2 = functools.lru_cache(DEFAULT_CACHE_SIZE)(Address._from_tnc2)
+
+
+def set_cache_size(maxsize: int = DEFAULT_CACHE_SIZE) -> None:
+    """
+    Resize the caches which intern Addresses decoded by from_bytes and from_str
+    (and by TNC2Decode).
+
+    Because Address is frozen, the same instance can be shared by every frame
+    that mentions a callsign. Resizing drops all cached entries and counters.
+
+    :param maxsize: entries kept in each LRU cache; 0 disables interning.
+    """
+    global _cached_from_bytes, _cached_from_str, _cached_from_tnc2
+    _cached_from_bytes = functools.lru_cache(maxsize)(Address._from_bytes)
+    _cached_from_str = functools.lru_cache(maxsize)(Address._from_str)
+    _cached_from_tnc2 = functools.lru_cache(maxsize)(Address._from_tnc2)
+
+
+def cache_info() -> Dict[str, Any]:
+    """Hit and miss counters for the "bytes", "str" and "tnc2" interning caches."""
+    return {
+        "bytes": _cached_from_bytes.cache_info(),
+        "str": _cached_from_str.cache_info(),
+        "tnc2": _cached_from_tnc2.cache_info(),
+    }
+
+
+def cache_clear() -> None:
+    """Drop all interned Addresses and reset the counters."""
+    _cached_from_bytes.cache_clear()
+    _cached_from_str.cache_clear()
+    _cached_from_tnc2.cache_clear()
@@ -0,0 +1,411 @@
+"""Append-only binary frame archive with a time and callsign index.
+
+An archive file starts with `MAGIC`, followed by records of::
+
+    uint32 length, float64 timestamp, <length> bytes of AX.25 frame (no FCS)
+
+all little endian. Records are grouped into blocks of `block_size`
+consecutive records. The sidecar index (the archive path plus
+`INDEX_SUFFIX`) is append-only JSON lines: a ``{"block_size": n}`` header,
+then one line per full block with its offset, end, record count, timestamp
+range and the source and destination callsigns in it. Records after the
+last full block are scanned when the archive is opened. Readers only decode
+the blocks which can match a query.
+"""
+import json
+import os
+import struct
+import time
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    SupportsBytes,
+    Tuple,
+    Union,
+)
+
+from attrs import define, field
+
+from .address import Address
+from .frame import Frame, LazyFrame
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+MAGIC = b"AX253AR\x01"
+INDEX_SUFFIX = ".idx"
+RECORD_HEADER = struct.Struct("<Id")
+DEFAULT_BLOCK_SIZE = 1024
+
+# index block entries: [offset, end, count, min timestamp, max timestamp]
+_OFFSET, _END, _COUNT, _MIN_TS, _MAX_TS = range(5)
+
+
+def _iter_records(data: bytes, offset: int) -> Iterator[Tuple[int, float, memoryview]]:
+    """Yield (offset, timestamp, frame bytes) of each complete record in `data`."""
+    with memoryview(data) as view:
+        pos = 0
+        while pos + RECORD_HEADER.size <= len(view):
+            length, timestamp = RECORD_HEADER.unpack_from(view, pos)
+            end = pos + RECORD_HEADER.size + length
+            if end > len(view):
+                break
+            yield offset + pos, timestamp, view[pos + RECORD_HEADER.size : end]
+            pos = end
+
+
+def _callsigns(raw: Union[bytes, memoryview]) -> Tuple[str, str]:
+    """Destination and source callsigns of an encoded frame."""
+    if len(raw) < 14:
+        raise ValueError("Frame of {} bytes has no address header".format(len(raw)))
+    return (
+        Address.from_bytes(raw[:7]).callsign.decode("ascii"),
+        Address.from_bytes(raw[7:14]).callsign.decode("ascii"),
+    )
+
+
+@define
+class _Index:
+    """Blocks of an archive: full blocks from the index file, then the rest."""
+
+    block_size: int
+    size: int = len(MAGIC)
+    """End of the last indexed record."""
+    blocks: List[List[Any]] = field(factory=list)
+    callsigns: Dict[str, List[int]] = field(factory=dict)
+    """Ids of the blocks in which each callsign appears."""
+    written: int = 0
+    """Number of blocks in the index file."""
+    # callsigns of the blocks which are not in the index file yet
+    _block_callsigns: Dict[int, Set[str]] = field(factory=dict)
+
+    @classmethod
+    def load(cls, index_file: Any, block_size: int, data_size: int) -> "_Index":
+        """
+        Read the full blocks from a binary index file, if it is usable.
+
+        The file is left positioned after the last complete line describing
+        data which is present in the archive.
+        """
+        header = index_file.readline()
+        try:
+            block_size = json.loads(header)["block_size"]
+        except (ValueError, KeyError):
+            index_file.seek(0)
+            return cls(block_size)
+        index = cls(block_size)
+        valid_end = len(header)
+        for line in index_file:
+            if not line.endswith(b"\n"):
+                # torn append
+                break
+            try:
+                offset, end, count, min_ts, max_ts, callsigns = json.loads(line)
+            except ValueError:
+                break
+            if end > data_size:
+                # the index is newer than the archive
+                break
+            block_id = len(index.blocks)
+            index.blocks.append([offset, end, count, min_ts, max_ts])
+            for callsign in callsigns:
+                index.callsigns.setdefault(callsign, []).append(block_id)
+            index.size = end
+            valid_end += len(line)
+        index.written = len(index.blocks)
+        index_file.seek(valid_end)
+        return index
+
+    def add(
+        self,
+        offset: int,
+        timestamp: float,
+        length: int,
+        callsigns: Iterable[str],
+    ) -> None:
+        """Add the record at `offset` to the last block."""
+        blocks = self.blocks
+        if not blocks or blocks[-1][_COUNT] >= self.block_size:
+            blocks.append([offset, offset, 0, timestamp, timestamp])
+        block = blocks[-1]
+        block[_COUNT] += 1
+        if timestamp < block[_MIN_TS]:
+            block[_MIN_TS] = timestamp
+        elif timestamp > block[_MAX_TS]:
+            block[_MAX_TS] = timestamp
+        block_id = len(blocks) - 1
+        block_callsigns = self._block_callsigns.setdefault(block_id, set())
+        for callsign in callsigns:
+            if callsign not in block_callsigns:
+                block_callsigns.add(callsign)
+                self.callsigns.setdefault(callsign, []).append(block_id)
+        self.size = block[_END] = offset + RECORD_HEADER.size + length
+
+    def add_records(self, data: bytes, offset: int) -> None:
+        """Add the complete records in `data`, read from `offset`."""
+        for record_offset, timestamp, raw in _iter_records(data, offset):
+            self.add(record_offset, timestamp, len(raw), _callsigns(raw))
+
+    def seal(self) -> bytes:
+        """Index lines for the full blocks which are not in the index file."""
+        lines = []
+        while (
+            self.written < len(self.blocks)
+            and self.blocks[self.written][_COUNT] >= self.block_size
+        ):
+            callsigns = sorted(self._block_callsigns.pop(self.written))
+            lines.append(
+                json.dumps(
+                    self.blocks[self.written] + [callsigns], separators=(",", ":")
+                )
+            )
+            self.written += 1
+        return "".join(line + "\n" for line in lines).encode("ascii")
+
+
+@define(frozen=True, slots=True)
+class ArchiveRecord:
+    """A frame read from an archive, with the time it was received."""
+
+    timestamp: float
+    frame: Union[Frame, LazyFrame]
+    offset: int
+    """Position of the record in the archive file."""
+
+
+@define
+class ArchiveWriter:
+    """
+    Append frames to an archive, creating it if needed.
+
+    Records are written through a buffered file, which is fsynced once
+    `sync_records` records or `sync_interval` seconds have accumulated since
+    the last sync, and on :meth:`close`. Each sync then appends the blocks
+    which filled up since the previous one to the index, so its cost does not
+    grow with the archive. When the archive is opened again, records after
+    the last indexed block are scanned, and a partially written record at the
+    end is truncated.
+
+    Use as a context manager, or call :meth:`close`.
+    """
+
+    path: Union[str, "os.PathLike[str]"]
+    block_size: int = field(default=DEFAULT_BLOCK_SIZE)
+    """Records per index block; only used when creating the archive."""
+    sync_records: int = field(default=1024)
+    sync_interval: float = field(default=1.0)
+    _file: Any = field(default=None, init=False, repr=False)
+    _index_file: Any = field(default=None, init=False, repr=False)
+    _index: _Index = field(init=False, repr=False)
+    _unsynced: int = field(default=0, init=False)
+    _last_sync: float = field(factory=time.monotonic, init=False, repr=False)
+
+    def __attrs_post_init__(self) -> None:
+        index_path = str(self.path) + INDEX_SUFFIX
+        if not os.path.exists(self.path) or not os.path.getsize(self.path):
+            self._file = open(self.path, "w+b")
+            self._file.write(MAGIC)
+            self._file.flush()
+            self._index = _Index(self.block_size)
+            self._new_index_file(index_path)
+            return
+        self._file = open(self.path, "r+b")
+        if self._file.read(len(MAGIC)) != MAGIC:
+            self._file.close()
+            raise ValueError("{!r} is not an ax253 archive".format(self.path))
+        data_size = os.path.getsize(self.path)
+        try:
+            self._index_file = open(index_path, "r+b")
+        except FileNotFoundError:
+            self._index = _Index(self.block_size)
+            self._new_index_file(index_path)
+        else:
+            self._index = _Index.load(self._index_file, self.block_size, data_size)
+            if self._index_file.tell():
+                # drop lines describing data which never reached the archive
+                self._index_file.truncate()
+            else:
+                self._index_file.close()
+                self._new_index_file(index_path)
+        self.block_size = self._index.block_size
+        # index records written after the last full block
+        self._file.seek(self._index.size)
+        self._index.add_records(self._file.read(), self._index.size)
+        self._file.truncate(self._index.size)
+        self._file.seek(self._index.size)
+
+    def _new_index_file(self, index_path: str) -> None:
+        self._index_file = open(index_path, "w+b")
+        self._index_file.write(
+            json.dumps({"block_size": self._index.block_size}).encode("ascii") + b"\n"
+        )
+        self._index_file.flush()
+        os.fsync(self._index_file.fileno())
+
+    def write(self, frame: SupportsBytes, timestamp: Optional[float] = None) -> None:
+        """
+        Append a frame.
+
+        :param timestamp: receive time in seconds since the epoch; now if None.
+        :raises ValueError: if the frame has no valid address header, in
+            which case nothing is written.
+        """
+        raw = bytes(frame)
+        # raises before anything is written if the frame can't be indexed
+        callsigns = _callsigns(raw)
+        if timestamp is None:
+            timestamp = time.time()
+        offset = self._index.size
+        self._file.write(RECORD_HEADER.pack(len(raw), timestamp))
+        self._file.write(raw)
+        self._index.add(offset, timestamp, len(raw), callsigns)
+        self._unsynced += 1
+        if (
+            self._unsynced >= self.sync_records
+            or time.monotonic() - self._last_sync >= self.sync_interval
+        ):
+            self.sync()
+
+    def sync(self) -> None:
+        """Flush and fsync the archive, then append newly filled blocks to the index."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        # the index only ever describes data which is already on disk
+        lines = self._index.seal()
+        if lines:
+            self._index_file.write(lines)
+            self._index_file.flush()
+            os.fsync(self._index_file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """Sync and close the archive."""
+        if self._file is None:
+            return
+        self.sync()
+        self._file.close()
+        self._file = None
+        self._index_file.close()
+        self._index_file = None
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+@define
+class ArchiveReader:
+    """
+    Query the frames in an archive by receive time and callsign.
+
+    Full blocks are read from the index, and the records after them are
+    scanned, so every record which had reached the archive file when it was
+    loaded is visible. Without an index, the whole archive is scanned.
+    """
+
+    path: Union[str, "os.PathLike[str]"]
+    lazy: bool = field(default=False)
+    """If True, yield LazyFrame instead of Frame."""
+    _index: _Index = field(init=False, repr=False)
+
+    def __attrs_post_init__(self) -> None:
+        self.reload()
+
+    def reload(self) -> None:
+        """Load the archive again, to see records written since it was loaded."""
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError("{!r} is not an ax253 archive".format(self.path))
+            data_size = os.path.getsize(self.path)
+            try:
+                with open(str(self.path) + INDEX_SUFFIX, "rb") as index_file:
+                    index = _Index.load(index_file, DEFAULT_BLOCK_SIZE, data_size)
+            except FileNotFoundError:
+                index = _Index(DEFAULT_BLOCK_SIZE)
+            f.seek(index.size)
+            index.add_records(f.read(), index.size)
+            self._index = index
+
+    def __len__(self) -> int:
+        return sum(block[_COUNT] for block in self._index.blocks)
+
+    @property
+    def callsigns(self) -> List[str]:
+        """Every source and destination callsign in the archive."""
+        return sorted(self._index.callsigns)
+
+    def _block_ids(
+        self,
+        start: Optional[float],
+        end: Optional[float],
+        callsign: Optional[str],
+    ) -> List[int]:
+        blocks = self._index.blocks
+        if callsign is None:
+            block_ids = range(len(blocks))
+        else:
+            block_ids = self._index.callsigns.get(callsign, [])
+        return [
+            block_id
+            for block_id in block_ids
+            if (start is None or blocks[block_id][_MAX_TS] >= start)
+            and (end is None or blocks[block_id][_MIN_TS] < end)
+        ]
+
+    def query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        callsign: Optional[str] = None,
+    ) -> Iterator[ArchiveRecord]:
+        """
+        Iterate through matching records in archive order.
+
+        :param start: earliest timestamp to include.
+        :param end: timestamp to stop before.
+        :param callsign: only frames to or from this station. Without an
+            SSID (``N0CALL``) any SSID matches, otherwise (``N0CALL-7``)
+            only that one.
+        """
+        ssid = None
+        if callsign is not None:
+            callsign, _, ssid_text = callsign.upper().partition("-")
+            ssid = int(ssid_text) if ssid_text else None
+        blocks = self._index.blocks
+        with open(self.path, "rb") as f:
+            for block_id in self._block_ids(start, end, callsign):
+                offset, block_end = blocks[block_id][_OFFSET], blocks[block_id][_END]
+                f.seek(offset)
+                data = f.read(block_end - offset)
+                for record_offset, timestamp, raw in _iter_records(data, offset):
+                    if (start is not None and timestamp < start) or (
+                        end is not None and timestamp >= end
+                    ):
+                        continue
+                    if callsign is not None:
+                        destination = Address.from_bytes(raw[:7])
+                        source = Address.from_bytes(raw[7:14])
+                        if not any(
+                            address.callsign.decode("ascii") == callsign
+                            and (ssid is None or address.ssid == ssid)
+                            for address in (destination, source)
+                        ):
+                            continue
+                    yield ArchiveRecord(
+                        timestamp=timestamp,
+                        frame=Frame.from_bytes(raw, lazy=self.lazy),
+                        offset=record_offset,
+                    )
+
+    def __iter__(self) -> Iterator[ArchiveRecord]:
+        return self.query()
@@ -0,0 +1,191 @@
+"""Decode many AX.25 frames into columnar arrays."""
+from array import array
+from typing import Any, Dict, Iterable, Iterator, Sequence, Union
+
+from attrs import define, field
+
+from .address import _SHIFT_RIGHT, A7_HLDC, A7_SSID
+from .frame import (
+    _FRAME_TYPE_BY_CONTROL,
+    find_frame_spans,
+    Frame,
+    FrameType,
+    LazyFrame,
+    valid_frame_spans,
+)
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+# width of the callsign columns, space padded as in the address field
+CALLSIGN_SIZE = 6
+# value of the `pid` column for frames which have no PID
+NO_PID = -1
+
+
+@define
+class FrameBatch:
+    """
+    Header fields of many AX.25 frames stored as parallel arrays.
+
+    All frames share one `buffer`: frame ``i`` is
+    ``buffer[starts[i]:ends[i]]`` and its information field is
+    ``buffer[info_starts[i]:ends[i]]``. Frame objects are only created on
+    demand by indexing or iterating the batch.
+    """
+
+    buffer: Union[bytes, memoryview]
+    starts: array = field(factory=lambda: array("q"))
+    ends: array = field(factory=lambda: array("q"))
+    destination: bytearray = field(factory=bytearray)
+    """Destination callsigns, 6 space padded bytes per frame."""
+    destination_ssid: array = field(factory=lambda: array("B"))
+    source: bytearray = field(factory=bytearray)
+    """Source callsigns, 6 space padded bytes per frame."""
+    source_ssid: array = field(factory=lambda: array("B"))
+    path_length: array = field(factory=lambda: array("B"))
+    control: array = field(factory=lambda: array("B"))
+    pid: array = field(factory=lambda: array("h"))
+    """PID byte, or NO_PID for frames which do not carry one."""
+    info_starts: array = field(factory=lambda: array("q"))
+
+    @classmethod
+    def from_frames(cls, raw_frames: Iterable[bytes]) -> "FrameBatch":
+        """Decode a sequence of encoded frames (without FCS)."""
+        starts, ends = array("q"), array("q")
+        offset = 0
+        chunks = []
+        for raw in raw_frames:
+            chunks.append(raw)
+            starts.append(offset)
+            offset += len(raw)
+            ends.append(offset)
+        return cls.from_buffer(b"".join(chunks), starts, ends)
+
+    @classmethod
+    def from_capture(cls, buffer: Union[bytes, memoryview]) -> "FrameBatch":
+        """
+        Decode every frame with a valid FCS from flag delimited AX.25 data.
+
+        Frames whose FCS does not match are skipped.
+        """
+        starts, ends = find_frame_spans(buffer)
+        return cls.from_buffer(buffer, *valid_frame_spans(buffer, starts, ends))
+
+    @classmethod
+    def from_buffer(
+        cls,
+        buffer: Union[bytes, memoryview],
+        starts: Sequence[int],
+        ends: Sequence[int],
+    ) -> "FrameBatch":
+        """
+        Decode the frames found at the given offsets in a shared buffer.
+
+        :param buffer: bytes or a read-only buffer which holds the frames.
+        :param starts: offset of the first byte of each frame.
+        :param ends: offset just past the last byte of each frame, excluding FCS.
+        """
+        batch = cls(
+            buffer=buffer,
+            starts=array("q", starts),
+            ends=array("q", ends),
+        )
+        for index, (start, end) in enumerate(zip(batch.starts, batch.ends)):
+            batch._decode_header(index, start, end)
+        batch.destination = batch.destination.translate(_SHIFT_RIGHT)
+        batch.source = batch.source.translate(_SHIFT_RIGHT)
+        return batch
+
+    def _decode_header(self, index: int, start: int, end: int) -> None:
+        buf = self.buffer
+        last = start + 13
+        # the low bit of the final SSID byte terminates the address field
+        while last < end and not buf[last] & A7_HLDC:
+            last += 7
+        control_at = last + 1
+        if control_at >= end:
+            raise ValueError(
+                "Frame {} at offset {} is truncated: {!r}".format(
+                    index, start, bytes(buf[start:end])
+                )
+            )
+        control = buf[control_at]
+        info_start = control_at + Frame.CONTROL_SIZE
+        if _FRAME_TYPE_BY_CONTROL[control] in (FrameType.I, FrameType.U_UI):
+            self.pid.append(buf[info_start] if info_start < end else NO_PID)
+            info_start += 1
+        else:
+            self.pid.append(NO_PID)
+        self.destination += buf[start : start + CALLSIGN_SIZE]
+        self.destination_ssid.append((buf[start + 6] & A7_SSID) >> 1)
+        self.source += buf[start + 7 : start + 7 + CALLSIGN_SIZE]
+        self.source_ssid.append((buf[start + 13] & A7_SSID) >> 1)
+        self.path_length.append((last - start - 13) // 7)
+        self.control.append(control)
+        self.info_starts.append(min(info_start, end))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def source_callsign(self, index: int) -> bytes:
+        """Callsign of the source of frame `index`, without padding."""
+        offset = index * CALLSIGN_SIZE
+        return bytes(self.source[offset : offset + CALLSIGN_SIZE]).rstrip()
+
+    def destination_callsign(self, index: int) -> bytes:
+        """Callsign of the destination of frame `index`, without padding."""
+        offset = index * CALLSIGN_SIZE
+        return bytes(self.destination[offset : offset + CALLSIGN_SIZE]).rstrip()
+
+    def info(self, index: int) -> bytes:
+        """Information field of frame `index`."""
+        return bytes(self.buffer[self.info_starts[index] : self.ends[index]])
+
+    def frame(self, index: int, lazy: bool = False) -> Union[Frame, LazyFrame]:
+        """Create a Frame (or LazyFrame) for the frame at `index`."""
+        with memoryview(self.buffer) as view:
+            return Frame.from_bytes(
+                view[self.starts[index] : self.ends[index]], lazy=lazy
+            )
+
+    def __getitem__(self, index: int) -> Frame:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("FrameBatch index out of range")
+        return self.frame(index)
+
+    def __iter__(self) -> Iterator[Frame]:
+        for index in range(len(self)):
+            yield self.frame(index)
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        Return the columns as numpy arrays, sharing memory where possible.
+
+        Callsign columns use the ``S6`` dtype with the padding removed.
+        """
+        import numpy
+
+        columns = {}
+        for name in (
+            "starts",
+            "ends",
+            "destination_ssid",
+            "source_ssid",
+            "path_length",
+            "control",
+            "pid",
+            "info_starts",
+        ):
+            column = getattr(self, name)
+            columns[name] = numpy.frombuffer(column, dtype=column.typecode)
+        for name in ("destination", "source"):
+            columns[name] = numpy.frombuffer(
+                bytes(getattr(self, name)).replace(b" ", b"\x00"),
+                dtype="S{}".format(CALLSIGN_SIZE),
+            )
+        return columns
@@ -0,0 +1,148 @@
+"""Replay capture files through a memory mapping."""
+import mmap
+import os
+import re
+from typing import Iterator, Union
+
+from attrs import define, field
+from attr import validators
+
+from .frame import AX25_FLAG, AX25_FLAG_B, AX25BytestreamDecoder, Frame, FrameError
+from .tnc2 import TNC2Decode
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+FORMATS = ("ax25", "tnc2")
+_LINE_REX = re.compile(rb"([^\r\n]*)(?:\r\n|\r|\n)")
+_LINE_END_REX = re.compile(rb"[\r\n]+")
+
+
+@define
+class CaptureReader:
+    """
+    Read frames from a capture file without loading it into memory.
+
+    The file is memory-mapped, so the operating system pages it in as it is
+    decoded and can drop those pages again; memory use does not grow with
+    the size of the file. With `format` "ax25" (flag delimited frames with
+    FCS) the default decoder yields LazyFrame backed by slices of the
+    mapping; "tnc2" reads CR-LF delimited lines with TNC2Decode.
+
+    A final frame or line without its closing delimiter is left unread, and
+    iterating again after the file has grown (see :meth:`reload`) resumes
+    from there.
+
+    Use as a context manager, or call :meth:`close`.
+    """
+
+    path: Union[str, "os.PathLike[str]"]
+    format: str = field(default="ax25", validator=validators.in_(FORMATS))
+    lazy: bool = field(default=True)
+    """With the default "ax25" decoder, yield LazyFrame instead of Frame."""
+    decoder: Union[AX25BytestreamDecoder, TNC2Decode] = field()
+    """Checks and decodes each frame; its error_policy and stats apply."""
+    _mapping: Union[mmap.mmap, bytes] = field(default=b"", init=False, repr=False)
+    _offset: int = field(default=0, init=False)
+
+    @decoder.default
+    def _decoder_factory(self) -> Union[AX25BytestreamDecoder, TNC2Decode]:
+        if self.format == "tnc2":
+            return TNC2Decode()
+        return AX25BytestreamDecoder(lazy=self.lazy)
+
+    def __attrs_post_init__(self) -> None:
+        self.reload()
+
+    def reload(self) -> None:
+        """Map the file again, to read data appended since it was opened."""
+        with open(self.path, "rb") as f:
+            try:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # empty files cannot be mapped
+                mapping = b""
+        if hasattr(mapping, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            mapping.madvise(mmap.MADV_SEQUENTIAL)
+        self._close_mapping()
+        self._mapping = mapping
+
+    def _close_mapping(self) -> None:
+        mapping, self._mapping = self._mapping, b""
+        if isinstance(mapping, mmap.mmap):
+            try:
+                mapping.close()
+            except BufferError:
+                # frames still hold slices; it is unmapped once they are freed
+                pass
+
+    def close(self) -> None:
+        """Release the mapping."""
+        self._close_mapping()
+
+    def __enter__(self) -> "CaptureReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._mapping)
+
+    def tell(self) -> int:
+        """Offset just past the last frame read."""
+        return self._offset
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        """
+        Move to a byte offset; reading resumes at the next frame boundary.
+
+        :return: the new offset.
+        """
+        if whence == os.SEEK_CUR:
+            offset += self._offset
+        elif whence == os.SEEK_END:
+            offset += len(self._mapping)
+        elif whence != os.SEEK_SET:
+            raise ValueError("Invalid whence {!r}".format(whence))
+        self._offset = min(max(offset, 0), len(self._mapping))
+        return self._offset
+
+    def __iter__(self) -> Iterator[Union[Frame, FrameError]]:
+        if self.format == "tnc2":
+            return self._iter_tnc2()
+        return self._iter_ax25()
+
+    def _iter_ax25(self) -> Iterator[Union[Frame, FrameError]]:
+        data = self._mapping
+        size = len(data)
+        pos = self._offset
+        if 0 < pos < size and AX25_FLAG not in (data[pos - 1], data[pos]):
+            # landed inside a frame, skip to the next flag
+            pos = data.find(AX25_FLAG_B, pos)
+            self._offset = pos = size if pos < 0 else pos
+        view = memoryview(data)
+        while pos < size:
+            while pos < size and data[pos] == AX25_FLAG:
+                pos += 1
+            end = data.find(AX25_FLAG_B, pos)
+            if end < 0:
+                break
+            self._offset = end
+            if end - pos > 2:
+                # frames keep their own slice of the mapping
+                yield from self.decoder._decode_packet(view[pos:end])
+            pos = end
+
+    def _iter_tnc2(self) -> Iterator[Union[Frame, FrameError]]:
+        data = self._mapping
+        pos = self._offset
+        if 0 < pos < len(data) and data[pos - 1] not in b"\r\n":
+            # landed inside a line, skip past its line ending
+            match = _LINE_END_REX.search(data, pos)
+            self._offset = pos = len(data) if match is None else match.end()
+        for match in _LINE_REX.finditer(data, pos):
+            self._offset = match.end()
+            yield from self.decoder._decode_lines((match.group(1),))
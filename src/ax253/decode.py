@@ -1,17 +1,29 @@
 """Generic deframing decoder."""
 import abc
 import asyncio
+import collections
+import concurrent.futures
+import enum
+import logging
+import queue
+import threading
+import time
 from types import TracebackType
 from typing import (
     Any,
     AsyncIterable,
+    Awaitable,
     Callable,
     cast,
+    Deque,
     Generic,
     Iterable,
+    Iterator,
+    List,
     Optional,
     Sequence,
     SupportsBytes,
+    Tuple,
     Type,
     TypeVar,
 )
@@ -23,11 +35,14 @@ __copyright__ = "Copyright 2022 Masen Furer and Contributors"
 __license__ = "Apache License, Version 2.0"
 
 
+_logger = logging.getLogger(__name__)
+
 # indicates that no more frames will appear on this protocol
 EOF = object()
 
 # Used throughout this module to represent the type of the decoded frame
 _T = TypeVar("_T")
+_R = TypeVar("_R")
 
 
 @define
@@ -60,21 +75,155 @@ class GenericDecoder(Generic[_T]):
         return
 
 
+class OverflowPolicy(enum.Enum):
+    """What FrameDecodeProtocol does when its frame queue is full."""
+
+    PAUSE = "pause"
+    """Pause reading from the transport until the consumer catches up."""
+    DROP_OLDEST = "drop_oldest"
+    """Discard the oldest queued frame to make room for the new one."""
+    DROP_NEWEST = "drop_newest"
+    """Discard the new frame."""
+
+
+@define
+class QueueStats:
+    """Counters for the FrameDecodeProtocol frame queue."""
+
+    dropped: int = 0
+    """Frames discarded by a drop policy."""
+    high_water_mark: int = 0
+    """Largest number of frames waiting in the queue."""
+    pauses: int = 0
+    """Times reading was paused because the queue was full."""
+
+
+def _decode_chunk(
+    decoder: GenericDecoder[_T],
+    data: Optional[bytes],
+) -> Tuple[GenericDecoder[_T], List[_T], Optional[Exception]]:
+    """
+    Feed `data` to the decoder, or flush it if data is None.
+
+    Runs in an executor, possibly in another process, so the decoder is
+    returned along with the frames and any error that stopped decoding.
+    """
+    frames = []
+    try:
+        for frame in decoder.flush() if data is None else decoder.update(data):
+            frames.append(frame)
+    except Exception as exc:
+        return decoder, frames, exc
+    return decoder, frames, None
+
+
 @define
 class FrameDecodeProtocol(asyncio.Protocol, Generic[_T]):
     """Protocol which uses a GenericDecoder to split the stream into frames."""
 
     transport: Optional[asyncio.Transport] = field(default=None)
     decoder: GenericDecoder[_T] = field(factory=GenericDecoder)
-    frames: asyncio.Queue = field(factory=asyncio.Queue, init=False)
+    max_queue_size: int = field(default=0)
+    """Maximum number of frames waiting to be read; 0 for no limit."""
+    overflow_policy: OverflowPolicy = field(
+        default=OverflowPolicy.PAUSE,
+        converter=OverflowPolicy,
+    )
+    """What to do when max_queue_size frames are waiting."""
+    push_only: bool = field(default=False)
+    """If True, frames only go to `callbacks`; the queue is never allocated."""
+    batch_callbacks: bool = field(default=False)
+    """If True, callbacks get a list of the frames decoded from each chunk."""
+    callbacks: List[Callable[[Any], None]] = field(factory=list)
+    """Called with each decoded frame (or batch of frames)."""
+    executor: Optional[concurrent.futures.Executor] = field(default=None)
+    """
+    If set, decode received data in this executor instead of the event loop.
+
+    Chunks are decoded one at a time in the order received. With a process
+    pool, the decoder and frames must be picklable; the decoder is sent
+    along with each chunk and its updated state is returned.
+
+    As when decoding inline, an exception from the decoder (such as with
+    ErrorPolicy.RAISE) is logged and aborts the connection. A failure of the
+    executor itself, such as a broken pool, says nothing about the data, so
+    it is logged and only that chunk is lost.
+    """
+    coalesce_writes: bool = field(default=False)
+    """If True, frames written during one loop iteration go out in one writelines."""
+    write_high_water: Optional[int] = field(default=None)
+    """Transport write buffer size at which writing is paused (see drain)."""
+    write_low_water: Optional[int] = field(default=None)
+    """Transport write buffer size at which writing is resumed."""
+    queue_stats: QueueStats = field(factory=QueueStats, init=False)
+    frames: Optional[asyncio.Queue] = field(init=False)
     connection_future: asyncio.Future = field(
         factory=asyncio.Future,
         init=False,
     )
+    _reading_paused: bool = field(default=False, init=False)
+    # chunks waiting to be decoded by the executor, None to flush
+    _pending: Deque[Optional[bytes]] = field(factory=collections.deque, init=False)
+    _offload_task: Optional[asyncio.Future] = field(default=None, init=False)
+    # encoded frames waiting for the next coalesced flush
+    _write_buffer: List[bytes] = field(factory=list, init=False)
+    _flush_handle: Optional[asyncio.Handle] = field(default=None, init=False)
+    _writing_paused: bool = field(default=False, init=False)
+    _drain_waiters: List[asyncio.Future] = field(factory=list, init=False)
+    # the loop running the transport, which may not be this thread's loop
+    _loop: Optional[asyncio.AbstractEventLoop] = field(default=None, init=False)
+
+    @frames.default
+    def _frames_factory(self) -> Optional[asyncio.Queue]:
+        return None if self.push_only else asyncio.Queue()
+
+    def _require_queue(self) -> asyncio.Queue:
+        if self.frames is None:
+            raise RuntimeError(
+                "Frames are not queued when push_only is set, use callbacks instead."
+            )
+        return self.frames
 
     def _queue_frame(self, frame: _T) -> None:
         self.frame_decoded(frame)
-        self.frames.put_nowait(frame)
+        if not self.batch_callbacks:
+            for callback in self.callbacks:
+                callback(frame)
+        frames = self.frames
+        if frames is None:
+            return
+        if self.max_queue_size and frames.qsize() >= self.max_queue_size:
+            if self.overflow_policy is OverflowPolicy.DROP_NEWEST:
+                self.queue_stats.dropped += 1
+                return
+            if self.overflow_policy is OverflowPolicy.DROP_OLDEST:
+                frames.get_nowait()
+                self.queue_stats.dropped += 1
+        frames.put_nowait(frame)
+        depth = frames.qsize()
+        if depth > self.queue_stats.high_water_mark:
+            self.queue_stats.high_water_mark = depth
+        if (
+            self.max_queue_size
+            and depth >= self.max_queue_size
+            and self.overflow_policy is OverflowPolicy.PAUSE
+            and not self._reading_paused
+            and self.transport is not None
+        ):
+            self._reading_paused = True
+            self.queue_stats.pauses += 1
+            self.transport.pause_reading()
+
+    def _frames_consumed(self) -> None:
+        """Resume reading once the queue has drained to half of max_queue_size."""
+        if (
+            self._reading_paused
+            and self.frames.qsize() <= self.max_queue_size // 2
+            and self.transport is not None
+        ):
+            self._reading_paused = False
+            if not self.transport.is_closing():
+                self.transport.resume_reading()
 
     def connection_made(self, transport: asyncio.Transport) -> None:
         """
@@ -85,22 +234,113 @@ class FrameDecodeProtocol(asyncio.Protocol, Generic[_T]):
         who depend on an active connection.
         """
         self.transport = transport
+        self._loop = asyncio.get_event_loop()
+        if self.write_high_water is not None or self.write_low_water is not None:
+            transport.set_write_buffer_limits(
+                high=self.write_high_water,
+                low=self.write_low_water,
+            )
         self.connection_future.set_result(transport)
 
+    def pause_writing(self) -> None:
+        """asyncio callback when the transport write buffer is above high water."""
+        self._writing_paused = True
+
+    def resume_writing(self) -> None:
+        """asyncio callback when the transport write buffer drains to low water."""
+        self._writing_paused = False
+        self._flush_writes()
+        self._wake_drain_waiters()
+
+    def _wake_drain_waiters(self) -> None:
+        waiters, self._drain_waiters = self._drain_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
     def frame_decoded(self, frame: _T) -> None:
         """Subclasses may override this function to handle new frame."""
         pass
 
+    def _deliver_frames(self, frames: Iterable[_T]) -> None:
+        if not self.batch_callbacks:
+            for frame in frames:
+                self._queue_frame(frame)
+            return
+        batch = []
+        try:
+            for frame in frames:
+                self._queue_frame(frame)
+                batch.append(frame)
+        finally:
+            if batch:
+                for callback in self.callbacks:
+                    callback(batch)
+
+    def _offload(self, data: Optional[bytes]) -> None:
+        self._pending.append(data)
+        if self._offload_task is None or self._offload_task.done():
+            self._offload_task = asyncio.ensure_future(self._run_offload())
+
+    async def _run_offload(self) -> None:
+        loop = asyncio.get_event_loop()
+        pending = self._pending
+        while pending:
+            if pending[0] is None:
+                data = pending.popleft()
+            else:
+                # decode everything received so far in one executor call
+                chunks = []
+                while pending and pending[0] is not None:
+                    chunks.append(pending.popleft())
+                data = b"".join(chunks)
+            frames: List[_T] = []
+            exc: Optional[Exception] = None
+            try:
+                self.decoder, frames, exc = await loop.run_in_executor(
+                    self.executor, _decode_chunk, self.decoder, data
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as executor_exc:
+                # a broken or shut down pool, or a decoder which can't be
+                # pickled; the chunk is lost but the connection keeps going
+                _logger.error(
+                    "Error running decoder in executor", exc_info=executor_exc
+                )
+            try:
+                self._deliver_frames(frames)
+            finally:
+                if exc is not None:
+                    _logger.error("Error decoding received data", exc_info=exc)
+                    if data is not None and self.transport is not None:
+                        # end the connection, like an exception from data_received,
+                        # dropping the data received since but not the final flush
+                        while pending and pending[0] is not None:
+                            pending.popleft()
+                        self.transport.abort()
+                if data is None and self.frames is not None:
+                    self.frames.put_nowait(EOF)
+
     def data_received(self, data: bytes) -> None:
-        """Pass data off to decoder instance and put frames on the queue."""
-        for frame in self.decoder.update(data):
-            self._queue_frame(frame)
+        """Pass data off to decoder instance and deliver the decoded frames."""
+        if self.executor is not None:
+            self._offload(bytes(data))
+            return
+        self._deliver_frames(self.decoder.update(data))
 
     def connection_lost(self, exc: Exception) -> None:
         """asyncio callback when connection is lost."""
-        for frame in self.decoder.flush():
-            self._queue_frame(frame)
-        self.frames.put_nowait(EOF)
+        self._write_buffer.clear()
+        self._wake_drain_waiters()
+        if self.executor is not None:
+            self._offload(None)
+            return
+        try:
+            self._deliver_frames(self.decoder.flush())
+        finally:
+            if self.frames is not None:
+                self.frames.put_nowait(EOF)
 
     async def read(
         self,
@@ -114,9 +354,11 @@ class FrameDecodeProtocol(asyncio.Protocol, Generic[_T]):
         """
         if n_frames is None:
             n_frames = -1
+        frames = self._require_queue()
         transport = await self.connection_future
-        while (not transport.is_closing() or not self.frames.empty()) and n_frames:
-            frame = await self.frames.get()
+        while (not transport.is_closing() or not frames.empty()) and n_frames:
+            frame = await frames.get()
+            self._frames_consumed()
             if frame is EOF:
                 break
             if callback is not None:
@@ -124,6 +366,47 @@ class FrameDecodeProtocol(asyncio.Protocol, Generic[_T]):
             yield frame
             n_frames -= 1
 
+    async def read_batch(
+        self,
+        max_frames: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> List[_T]:
+        """
+        Take every frame that is already queued, up to max_frames.
+
+        Only suspends when the queue is empty, waiting up to `timeout` seconds
+        (or indefinitely if None) for the next frame.
+
+        :return: list of frames; empty on timeout or once the stream has ended.
+        """
+        frames = self._require_queue()
+        await self.connection_future
+        if frames.empty():
+            try:
+                batch = [await asyncio.wait_for(frames.get(), timeout)]
+            except asyncio.TimeoutError:
+                return []
+        else:
+            batch = [frames.get_nowait()]
+        while (max_frames is None or len(batch) < max_frames) and not frames.empty():
+            batch.append(frames.get_nowait())
+        self._frames_consumed()
+        if batch[-1] is EOF:
+            # leave EOF queued so later reads also see the end of the stream
+            frames.put_nowait(batch.pop())
+        return batch
+
+    async def iter_batches(
+        self,
+        max_frames: Optional[int] = None,
+    ) -> AsyncIterable[List[_T]]:
+        """Iterate through lists of decoded frames until the stream ends."""
+        while True:
+            batch = await self.read_batch(max_frames=max_frames)
+            if not batch:
+                break
+            yield batch
+
     def read_frames(
         self,
         n_frames: Optional[int] = -1,
@@ -135,20 +418,70 @@ class FrameDecodeProtocol(asyncio.Protocol, Generic[_T]):
             loop = asyncio.get_event_loop()
 
         if n_frames is not None and n_frames < 0:
-            n_frames = self.frames.qsize()
+            n_frames = self._require_queue().qsize()
 
         async def _():
             return [f async for f in self.read(n_frames=n_frames, callback=callback)]
 
         return loop.run_until_complete(_())
 
+    def encode_frame(self, frame: SupportsBytes) -> bytes:
+        """Serialize a frame for the transport; subclasses may override."""
+        return bytes(frame)
+
     def write(self, frame: SupportsBytes) -> None:
         """
         Write serialized frame to the underlying transport.
 
         :param frame: Frame to write.
         """
-        self.transport.write(bytes(frame))
+        if self.coalesce_writes:
+            self._buffer_writes([self.encode_frame(frame)])
+        else:
+            self.transport.write(self.encode_frame(frame))
+
+    def write_many(self, frames: Iterable[SupportsBytes]) -> None:
+        """
+        Write several serialized frames with a single transport call.
+
+        :param frames: Frames to write.
+        """
+        encoded = [self.encode_frame(frame) for frame in frames]
+        if self.coalesce_writes:
+            self._buffer_writes(encoded)
+        else:
+            self.transport.writelines(encoded)
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            return asyncio.get_event_loop()
+        return self._loop
+
+    def _buffer_writes(self, encoded: List[bytes]) -> None:
+        self._write_buffer.extend(encoded)
+        if self._flush_handle is None and not self._writing_paused:
+            self._flush_handle = self._get_loop().call_soon(self._flush_writes)
+
+    def _flush_writes(self) -> None:
+        self._flush_handle = None
+        if self._write_buffer and not self._writing_paused:
+            buffered, self._write_buffer = self._write_buffer, []
+            self.transport.writelines(buffered)
+
+    async def drain(self) -> None:
+        """
+        Wait until buffered writes are handed to the transport and its write
+        buffer is below the low water mark.
+        """
+        while (self._writing_paused or self._write_buffer) and not (
+            self.transport is None or self.transport.is_closing()
+        ):
+            if not self._writing_paused:
+                self._flush_writes()
+                continue
+            waiter = self._get_loop().create_future()
+            self._drain_waiters.append(waiter)
+            await waiter
 
 
 @define
@@ -158,17 +491,35 @@ class SyncFrameDecode(abc.ABC, Generic[_T]):
 
     It is recommended to use this class as a contextmanager for automatic
     start/stop functionality.
+
+    In `threaded` mode the event loop runs in a daemon thread shared by all
+    threaded instances. A task on that loop reads the protocol and hands the
+    frames to the caller through a thread-safe queue, holding no more than the
+    protocol's max_queue_size. Subclasses should run coroutines with
+    :meth:`run` and must not call `run_until_complete` on :attr:`loop`
+    directly.
     """
 
     _loop = None
     """The asyncio event loop that this class and subclasses will use."""
+    _thread_loop = None
+    """The event loop running in a background thread, for `threaded` mode."""
+    _thread_loop_lock = threading.Lock()
 
     _protocol: Optional[FrameDecodeProtocol[_T]] = field(default=None)
     """The connected protocol (access via .protocol property)."""
+    threaded: bool = field(default=False)
+    """Run the event loop in a background thread instead of on each call."""
+    # frames handed from the loop thread to readers in threaded mode
+    _sync_frames: Optional[queue.Queue] = field(default=None, init=False)
+    # set (on the loop) when readers have made room in _sync_frames
+    _room: Optional[asyncio.Event] = field(default=None, init=False)
 
     @property
     def loop(self) -> asyncio.BaseEventLoop:
         """Get a reference to a shared event loop for this class."""
+        if self.threaded:
+            return self._get_thread_loop()
         if SyncFrameDecode._loop is None:
             try:
                 SyncFrameDecode._loop = asyncio.get_running_loop()
@@ -177,6 +528,25 @@ class SyncFrameDecode(abc.ABC, Generic[_T]):
                 asyncio.set_event_loop(SyncFrameDecode._loop)
         return SyncFrameDecode._loop
 
+    @staticmethod
+    def _get_thread_loop() -> asyncio.BaseEventLoop:
+        with SyncFrameDecode._thread_loop_lock:
+            if SyncFrameDecode._thread_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever,
+                    name="SyncFrameDecode",
+                    daemon=True,
+                ).start()
+                SyncFrameDecode._thread_loop = loop
+            return SyncFrameDecode._thread_loop
+
+    def run(self, coro: Awaitable[_R]) -> _R:
+        """Run a coroutine on this instance's event loop and return its result."""
+        if self.threaded:
+            return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+        return self.loop.run_until_complete(coro)
+
     @property
     def protocol(self) -> FrameDecodeProtocol[_T]:
         if self._protocol is None:
@@ -193,8 +563,40 @@ class SyncFrameDecode(abc.ABC, Generic[_T]):
                     FrameDecodeProtocol, p
                 ),
             )
+        if self.threaded and p.frames is not None:
+            self._sync_frames = queue.Queue()
+            self.run(self._start_pump(p, self._sync_frames))
         self._protocol = p
 
+    async def _start_pump(
+        self, protocol: FrameDecodeProtocol[_T], sync_frames: queue.Queue
+    ) -> None:
+        self._room = room = asyncio.Event()
+        asyncio.ensure_future(self._pump(protocol, sync_frames, room))
+
+    @staticmethod
+    async def _pump(
+        protocol: FrameDecodeProtocol[_T],
+        sync_frames: queue.Queue,
+        room: asyncio.Event,
+    ) -> None:
+        """Move frames from the protocol to `sync_frames`; runs on the loop thread."""
+        limit = protocol.max_queue_size
+        try:
+            async for batch in protocol.iter_batches(max_frames=limit or None):
+                for frame in batch:
+                    sync_frames.put_nowait(frame)
+                while limit:
+                    # clear before checking, so a reader making room after
+                    # the check always sets it again
+                    room.clear()
+                    if sync_frames.qsize() < limit:
+                        break
+                    # leave frames in the protocol, which pauses reading
+                    await room.wait()
+        finally:
+            sync_frames.put_nowait(EOF)
+
     def __enter__(self) -> "SyncFrameDecode":
         self.start()
         return self
@@ -228,6 +630,7 @@ class SyncFrameDecode(abc.ABC, Generic[_T]):
         self,
         callback: Optional[Callable[[_T], None]] = None,
         min_frames: Optional[int] = -1,
+        timeout: Optional[float] = None,
     ) -> Sequence[_T]:
         """
         Read frames from underlying protocol.
@@ -238,19 +641,71 @@ class SyncFrameDecode(abc.ABC, Generic[_T]):
         :param min_frames: block until this minimum number of frames are available.
             if -1 (default), return all buffered frames without blocking
             if None, read until EOF is seen (device closed)
+        :param timeout: stop blocking after this many seconds and return the
+            frames read so far.
         :return: List of frames
         """
         if self.protocol is None:
             raise EOFError(
                 "Underlying connection is not active. Hint: did you call start()?",
             )
-        return list(
-            self.protocol.read_frames(
-                n_frames=min_frames,
-                callback=callback,
-                loop=self.loop,
-            )
-        )
+        if self.threaded:
+            return self._read_threaded(callback, min_frames, timeout)
+        protocol = self.protocol
+        if min_frames is not None and min_frames < 0:
+            min_frames = protocol._require_queue().qsize()
+        frames: List[_T] = []
+
+        async def _() -> None:
+            async for frame in protocol.read(n_frames=min_frames, callback=callback):
+                frames.append(frame)
+
+        try:
+            self.run(asyncio.wait_for(_(), timeout))
+        except asyncio.TimeoutError:
+            pass
+        return frames
+
+    def _read_threaded(
+        self,
+        callback: Optional[Callable[[_T], None]],
+        min_frames: Optional[int],
+        timeout: Optional[float],
+    ) -> List[_T]:
+        protocol = self.protocol
+        protocol._require_queue()
+        sync_queue = self._sync_frames
+        assert sync_queue is not None and self._room is not None
+        limit = protocol.max_queue_size
+        block = min_frames is None or min_frames >= 0
+        deadline = None if timeout is None else time.monotonic() + timeout
+        frames: List[_T] = []
+        while min_frames is None or min_frames < 0 or len(frames) < min_frames:
+            remaining = None
+            if deadline is not None:
+                remaining = max(0.0, deadline - time.monotonic())
+            try:
+                frame = sync_queue.get(block=block, timeout=remaining)
+            except queue.Empty:
+                break
+            if limit and sync_queue.qsize() <= limit // 2 and not self._room.is_set():
+                self.loop.call_soon_threadsafe(self._room.set)
+            if frame is EOF:
+                # leave EOF for the next reader
+                sync_queue.put_nowait(EOF)
+                break
+            if callback is not None:
+                callback(frame)
+            frames.append(frame)
+        return frames
+
+    def __iter__(self) -> Iterator[_T]:
+        """Block on each frame in turn until the connection is closed."""
+        while True:
+            frames = self.read(min_frames=1)
+            if not frames:
+                return
+            yield from frames
 
     def write(self, frame: SupportsBytes) -> None:
         """
@@ -258,4 +713,19 @@ class SyncFrameDecode(abc.ABC, Generic[_T]):
 
         :param frame: Frame to write.
         """
-        self.protocol.write(frame)
+        if self.threaded:
+            # transports may only be used from the thread running their loop
+            self.loop.call_soon_threadsafe(self.protocol.write, frame)
+        else:
+            self.protocol.write(frame)
+
+    def write_many(self, frames: Iterable[SupportsBytes]) -> None:
+        """
+        Writes several frames to KISS interface at once.
+
+        :param frames: Frames to write.
+        """
+        if self.threaded:
+            self.loop.call_soon_threadsafe(self.protocol.write_many, list(frames))
+        else:
+            self.protocol.write_many(frames)
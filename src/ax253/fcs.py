@@ -29,7 +29,10 @@ OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
+import binascii
+import os
 import struct
+from typing import Callable, Dict, List, Optional, Sequence, Union
 
 from attrs import define, field
 
@@ -38,29 +41,172 @@ __copyright__ = "Copyright (c) 2013 Christopher H. Casebeer. All rights reserved
 __license__ = "BSD 2-clause Simplified License"
 
 
+# Anything exposing the buffer protocol with single byte items.
+BytesLike = Union[bytes, bytearray, memoryview]
+
+FCS_INIT = 0xFFFF
+FCS_POLY = 0x8408
+
+
+def _reverse_bits(byte: int) -> int:
+    return int("{:08b}".format(byte)[::-1], 2)
+
+
+def _table_entry(index: int) -> int:
+    fcs = index
+    for _ in range(8):
+        fcs = (fcs >> 1) ^ FCS_POLY if fcs & 0x1 else fcs >> 1
+    return fcs
+
+
+# `update_bit` consumes each byte MSB first, which is the same as running the
+# usual reflected CRC-16/X.25 byte update over the bit-reversed byte.
+_REVERSED = bytes(_reverse_bits(b) for b in range(256))
+_TABLE = tuple(_table_entry(i) for i in range(256))
+
+
+def _update_table(fcs: int, data: BytesLike) -> int:
+    """Feed `data` through the lookup table starting from register `fcs`."""
+    table, rev = _TABLE, _REVERSED
+    for byte in data:
+        fcs = (fcs >> 8) ^ table[(fcs ^ rev[byte]) & 0xFF]
+    return fcs
+
+
+def _reverse16(value: int) -> int:
+    return (_REVERSED[value & 0xFF] << 8) | _REVERSED[value >> 8]
+
+
+def _update_binascii(fcs: int, data: BytesLike) -> int:
+    """
+    Feed `data` through `binascii.crc_hqx`.
+
+    crc_hqx is the MSB-first CRC-CCITT (poly 0x1021). Shifting our reflected
+    register right is the same as shifting the bit-reversed register left, so
+    reversing the register on the way in and out gives identical results.
+    """
+    return _reverse16(binascii.crc_hqx(data, _reverse16(fcs)))
+
+
+# Available implementations, in order of preference.
+BACKENDS: Dict[str, Callable[[int, BytesLike], int]] = {
+    "binascii": _update_binascii,
+    "table": _update_table,
+}
+# Set to a backend name to override automatic selection.
+BACKEND_ENV_VAR = "AX253_FCS_BACKEND"
+
+BACKEND = ""
+"""Name of the active FCS backend."""
+_update = _update_table
+
+
+def select_backend(name: Optional[str] = None) -> str:
+    """
+    Activate the named FCS backend.
+
+    If `name` is not given, use the value of the `AX253_FCS_BACKEND`
+    environment variable, or else the first backend that works on this host.
+
+    :return: the name of the active backend
+    """
+    global BACKEND, _update
+    if name is None:
+        name = os.environ.get(BACKEND_ENV_VAR) or None
+    if name is not None:
+        if name not in BACKENDS:
+            raise ValueError(
+                "Unknown FCS backend {!r}, expected one of {}".format(
+                    name, ", ".join(BACKENDS)
+                )
+            )
+        candidates = [name]
+    else:
+        candidates = list(BACKENDS)
+    check = _update_table(FCS_INIT, b"123456789")
+    for candidate in candidates:
+        impl = BACKENDS[candidate]
+        try:
+            # sanity check against the reference implementation
+            ok = impl(FCS_INIT, b"123456789") == check
+        except Exception:
+            ok = False
+        if ok:
+            BACKEND, _update = candidate, impl
+            return BACKEND
+    raise RuntimeError("FCS backend {!r} is not usable on this host".format(name))
+
+
 @define
 class FCS:
-    fcs: int = field(default=0xFFFF)
+    fcs: int = field(default=FCS_INIT)
 
     def update_bit(self, bit) -> "FCS":
         check = self.fcs & 0x1 == 1
         self.fcs >>= 1
         if check != bit:
-            self.fcs ^= 0x8408
+            self.fcs ^= FCS_POLY
         return self
 
-    def update(self, data: bytes) -> "FCS":
-        for byte in data:
-            for i in range(7, -1, -1):
-                self.update_bit((byte >> i) & 0x01 == 1)
+    def update(self, data: BytesLike) -> "FCS":
+        """Feed bytes, bytearray or memoryview `data` into the running FCS."""
+        self.fcs = _update(self.fcs, data)
         return self
 
     def digest(self) -> bytes:
         return struct.pack("<H", ~self.fcs % 2**16)
 
     @classmethod
-    def from_bytes(cls, packet: bytes) -> "FCS":
+    def from_bytes(cls, packet: BytesLike) -> "FCS":
         return FCS().update(packet)
 
+    @classmethod
+    def compute(cls, packet: BytesLike) -> bytes:
+        """One-shot digest of `packet`."""
+        return struct.pack("<H", ~_update(FCS_INIT, packet) % 2**16)
+
+    @classmethod
+    def verify(cls, packet_with_fcs: BytesLike) -> bool:
+        """
+        Check a packet whose final two bytes are the FCS.
+
+        The payload is read through a memoryview, so the buffer is not copied.
+        """
+        with memoryview(packet_with_fcs) as view:
+            if len(view) < 2:
+                return False
+            expected = view[-2] | (view[-1] << 8)
+            with view[:-2] as payload:
+                return ~_update(FCS_INIT, payload) % 2**16 == expected
+
+    @classmethod
+    def verify_spans(
+        cls,
+        buffer: BytesLike,
+        starts: Sequence[int],
+        ends: Sequence[int],
+    ) -> List[bool]:
+        """
+        Check many packets in one shared buffer, each ending with its FCS.
+
+        :param starts: offset of the first byte of each packet.
+        :param ends: offset just past the FCS of each packet.
+        :return: whether the FCS matched, for each packet.
+        """
+        update = _update
+        results = []
+        with memoryview(buffer) as view:
+            for start, end in zip(starts, ends):
+                fcs_at = end - 2
+                results.append(
+                    fcs_at >= start
+                    and ~update(FCS_INIT, view[start:fcs_at]) % 2**16
+                    == view[fcs_at] | (view[fcs_at + 1] << 8)
+                )
+        return results
+
     def __bytes__(self) -> bytes:
-        return self.digest()
\ No newline at end of file
+        return self.digest()
+
+
+select_backend()
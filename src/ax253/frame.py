@@ -1,11 +1,12 @@
 """AX.25 frame encode/decode"""
 import enum
 import logging
-from typing import Any, Iterable, Optional, Sequence, Union
+import re
+from array import array
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
 
 from attrs import define, field
 from attr import converters, validators
-from bitarray import bitarray
 
 from . import util
 from .address import Address
@@ -21,6 +22,8 @@ _logger = logging.getLogger(__name__)
 
 AX25_FLAG = 0x7E
 AX25_FLAG_B = bytes([AX25_FLAG])
+# a run of bytes between flags: a frame followed by its FCS
+_FRAME_SPAN_REX = re.compile(b"[^" + re.escape(AX25_FLAG_B) + b"]+")
 
 # AX.25 Protocol ID — This field is set to 0xf0 (no layer 3 protocol).
 NO_PROTOCOL_ID = b"\xF0"
@@ -49,13 +52,25 @@ class FrameType(enum.Enum):
     I = 0x0  # noqa: E741
 
     @classmethod
-    def from_control_byte(cls, control: int):
-        for val in cls.__members__.values():
-            if control & val.value == val.value:
-                return val
-        raise ValueError(
-            "Cannot interpret control byte {!r} as a valid AX.25 frame type."
-        )
+    def from_control_byte(cls, control: int) -> "FrameType":
+        ftype = _FRAME_TYPE_BY_CONTROL[control] if 0 <= control <= 0xFF else None
+        if ftype is None:
+            raise ValueError(
+                "Cannot interpret control byte {!r} as a valid AX.25 frame "
+                "type.".format(control)
+            )
+        return ftype
+
+
+def _classify_control_byte(control: int) -> Optional[FrameType]:
+    for val in FrameType.__members__.values():
+        if control & val.value == val.value:
+            return val
+    return None
+
+
+# FrameType for each possible control byte value.
+_FRAME_TYPE_BY_CONTROL = tuple(_classify_control_byte(c) for c in range(256))
 
 
 def bytes_from_int(b_or_i) -> bytes:
@@ -71,9 +86,25 @@ class Control:
         validator=util.valid_length(1, 1, validators.instance_of(bytes)),
         converter=bytes_from_int,
     )
+    # Decoded fields, derived once from the (frozen) control byte.
+    _ftype: FrameType = field(init=False, eq=False, repr=False)
+    _n_r: int = field(init=False, eq=False, repr=False)
+    _n_s: int = field(init=False, eq=False, repr=False)
+    _p_f: bool = field(init=False, eq=False, repr=False)
+
+    def __attrs_post_init__(self) -> None:
+        control = self.v[0]
+        object.__setattr__(self, "_ftype", FrameType.from_control_byte(control))
+        object.__setattr__(self, "_n_r", control >> 5)
+        object.__setattr__(self, "_n_s", (control & 0x0F) >> 1)
+        # bv[4], counting from the most significant bit
+        object.__setattr__(self, "_p_f", bool(control & 0x08))
 
     @property
-    def bv(self) -> bitarray:
+    def bv(self) -> "bitarray":  # noqa: F821
+        """The control byte as a bitarray (requires the optional bitarray package)."""
+        from bitarray import bitarray
+
         bv = bitarray()
         bv.frombytes(self.v)
         return bv
@@ -81,32 +112,42 @@ class Control:
     @property
     def ftype(self) -> FrameType:
         """The FrameType associated with this Control byte."""
-        return FrameType.from_control_byte(self.v[0])
+        return self._ftype
 
     @classmethod
     def from_any(cls, obj: Any) -> "Control":
+        """Create a Control, sharing one instance per control byte value."""
         if isinstance(obj, cls):
             return obj
-        return Control(obj)
+        if cls is Control:
+            if isinstance(obj, int) and 0 <= obj <= 0xFF:
+                return _CONTROL_BY_VALUE[obj]
+            if isinstance(obj, (bytes, bytearray, memoryview)) and len(obj) == 1:
+                return _CONTROL_BY_VALUE[obj[0]]
+        return cls(obj)
 
     @property
     def n_r(self) -> int:
-        return self.v[0] >> 5
+        return self._n_r
 
     @property
     def n_s(self) -> int:
-        return (self.v[0] & 0x0F) >> 1
+        return self._n_s
 
     @property
     def p_f(self) -> bool:
-        return bool(self.bv[4])
+        return self._p_f
 
     def __bytes__(self) -> bytes:
         return self.v
 
 
+_CONTROL_BY_VALUE = tuple(Control(c) for c in range(256))
+_UI_CONTROL = _CONTROL_BY_VALUE[UI_CONTROL_FIELD[0]]
+
+
 def bytes_or_encode_utf8(v):
-    if isinstance(v, (bytes, bytearray)):
+    if isinstance(v, (bytes, bytearray, memoryview)):
         return bytes(v)
     return str(v).encode("utf-8")
 
@@ -132,6 +173,10 @@ class Frame:
         converter=converters.optional(bytes_from_int),
     )
     info: bytes = field(default=b"", converter=bytes_or_encode_utf8)
+    # Encodings are memoized on first use; the frame is frozen, so build a new
+    # one with attr.evolve rather than mutating `path` in place.
+    _encoded: Optional[bytes] = field(default=None, init=False, eq=False, repr=False)
+    _tnc2: Optional[str] = field(default=None, init=False, eq=False, repr=False)
 
     @classmethod
     def ui(
@@ -142,18 +187,53 @@ class Frame:
         info: bytes = b"",
     ):
         """Create a UI frame with the given information."""
+        path = path or []
+        last = len(path) - 1
         return cls(
             destination=Address.from_any(destination),
-            source=Address.from_any(source, a7_hldc=not bool(path)),
-            path=[Address.from_any(p, a7_hldc=(p == path[-1])) for p in path or []],
+            source=Address.from_any(source, a7_hldc=not path),
+            path=[Address.from_any(p, a7_hldc=i == last) for i, p in enumerate(path)],
             info=info,
         )
 
     @classmethod
-    def from_bytes(cls, ax25_bytes: bytes) -> "Frame":
+    def _ui_unchecked(
+        cls,
+        destination: Address,
+        source: Address,
+        path: List[Address],
+        info: bytes,
+    ) -> "Frame":
+        """
+        Create a UI frame like `ui`, but from already decoded Addresses.
+
+        The attrs converters and validators are skipped, so the caller must
+        pass values of the right types.
+        """
+        frame = object.__new__(cls)
+        _setattr = object.__setattr__
+        _setattr(frame, "destination", destination)
+        _setattr(frame, "source", source)
+        _setattr(frame, "path", path)
+        _setattr(frame, "control", _UI_CONTROL)
+        _setattr(frame, "pid", NO_PROTOCOL_ID)
+        _setattr(frame, "info", info)
+        _setattr(frame, "_encoded", None)
+        _setattr(frame, "_tnc2", None)
+        return frame
+
+    @classmethod
+    def from_bytes(
+        cls, ax25_bytes: bytes, lazy: bool = False
+    ) -> Union["Frame", "LazyFrame"]:
         """
         Decode the frame from AX.25 bytes.
+
+        :param lazy: if True, return a LazyFrame which only decodes each
+            field when it is first accessed.
         """
+        if lazy:
+            return LazyFrame(ax25_bytes)
         destination = Address.from_bytes(ax25_bytes[:7])
         source = last_address = Address.from_bytes(ax25_bytes[7:14])
         path = []
@@ -163,7 +243,7 @@ class Frame:
             path.append(last_address)
             path_start += 7
         info_start = control_end = path_start + cls.CONTROL_SIZE
-        control = Control(ax25_bytes[path_start:control_end])
+        control = Control.from_any(ax25_bytes[path_start:control_end])
         if control.ftype in (FrameType.I, FrameType.U_UI):
             info_start += 1
             pid = ax25_bytes[control_end:info_start]
@@ -180,6 +260,8 @@ class Frame:
 
     def __bytes__(self) -> bytes:
         """Encode the frame as AX.25."""
+        if self._encoded is not None:
+            return self._encoded
         encoded_frame = [
             bytes(self.destination),
             bytes(self.source),
@@ -189,7 +271,9 @@ class Frame:
         if self.control.ftype in (FrameType.I, FrameType.U_UI):
             encoded_frame.append(self.pid)
         encoded_frame.append(bytes(self.info))
-        return b"".join(encoded_frame)
+        encoded = b"".join(encoded_frame)
+        object.__setattr__(self, "_encoded", encoded)
+        return encoded
 
     @classmethod
     def from_str(cls, ax25_text: str) -> "Frame":
@@ -206,76 +290,479 @@ class Frame:
 
     def __str__(self) -> str:
         """Serialize the frame as TNC2 monitor format."""
-        full_path = [
-            str(self.destination),
-            *(str(p) for p in self.path or []),
-        ]
-        return "%s>%s:%s" % (
-            str(self.source),
-            ",".join(full_path),
-            bytes(self.info).decode("latin1"),
+        if self._tnc2 is None:
+            object.__setattr__(self, "_tnc2", _encode_tnc2(self))
+        return self._tnc2
+
+
+def _encode_tnc2(frame: Union[Frame, "LazyFrame"]) -> str:
+    full_path = [
+        str(frame.destination),
+        *(str(p) for p in frame.path or []),
+    ]
+    return "%s>%s:%s" % (
+        str(frame.source),
+        ",".join(full_path),
+        bytes(frame.info).decode("latin1"),
+    )
+
+
+def _retain_buffer(raw: Union[bytes, memoryview]) -> Union[bytes, memoryview]:
+    """Keep immutable buffers as-is; copy anything that may change underneath."""
+    if isinstance(raw, bytes):
+        return raw
+    if isinstance(raw, memoryview) and raw.readonly:
+        # a view of our own, so the caller may release theirs
+        return raw[:]
+    return bytes(raw)
+
+
+@define(eq=False)
+class LazyFrame:
+    """
+    An AX.25 Frame which decodes fields from the original bytes on first access.
+
+    Exposes the same read-only attributes as :class:`Frame`, and returns the
+    original bytes from ``bytes()`` without re-encoding. Use :meth:`to_frame`
+    to get a regular Frame.
+    """
+
+    _raw: Union[bytes, memoryview] = field(converter=_retain_buffer)
+    """The encoded frame; read-only buffers are referenced rather than copied."""
+    _control_at: int = field(default=-1, init=False, repr=False)
+    _destination: Optional[Address] = field(default=None, init=False, repr=False)
+    _source: Optional[Address] = field(default=None, init=False, repr=False)
+    _path: Optional[Sequence[Address]] = field(default=None, init=False, repr=False)
+    _control: Optional["Control"] = field(default=None, init=False, repr=False)
+    _tnc2: Optional[str] = field(default=None, init=False, repr=False)
+
+    def _find_control(self) -> int:
+        """Offset of the control byte, after the variable length address field."""
+        if self._control_at < 0:
+            raw = self._raw
+            last = 13
+            # the low bit of the final SSID byte terminates the address field
+            while last < len(raw) and not raw[last] & 0x01:
+                last += 7
+            if last >= len(raw):
+                raise ValueError(
+                    "Address field is not terminated in {!r}".format(bytes(raw))
+                )
+            self._control_at = last + 1
+        return self._control_at
+
+    @property
+    def destination(self) -> Address:
+        if self._destination is None:
+            self._destination = Address.from_bytes(self._raw[:7])
+        return self._destination
+
+    @property
+    def source(self) -> Address:
+        if self._source is None:
+            self._source = Address.from_bytes(self._raw[7:14])
+        return self._source
+
+    @property
+    def path(self) -> Sequence[Address]:
+        if self._path is None:
+            raw = self._raw
+            self._path = [
+                Address.from_bytes(raw[i : i + 7])
+                for i in range(14, self._find_control(), 7)
+            ]
+        return self._path
+
+    @property
+    def control(self) -> "Control":
+        if self._control is None:
+            control_at = self._find_control()
+            self._control = Control.from_any(
+                self._raw[control_at : control_at + Frame.CONTROL_SIZE]
+            )
+        return self._control
+
+    @property
+    def _info_start(self) -> int:
+        info_start = self._find_control() + Frame.CONTROL_SIZE
+        if self.control.ftype in (FrameType.I, FrameType.U_UI):
+            info_start += 1
+        return info_start
+
+    @property
+    def pid(self) -> Optional[bytes]:
+        """The Protocol ID, for I and UI frames."""
+        pid_at = self._find_control() + Frame.CONTROL_SIZE
+        if self._info_start > pid_at:
+            return bytes(self._raw[pid_at : pid_at + 1])
+        return None
+
+    @property
+    def info(self) -> bytes:
+        """The information field."""
+        return bytes(self._raw[self._info_start :])
+
+    def to_frame(self) -> Frame:
+        """Decode all fields into a regular Frame."""
+        return Frame(
+            destination=self.destination,
+            source=self.source,
+            path=self.path,
+            control=self.control,
+            pid=self.pid,
+            info=self.info,
         )
 
+    def __bytes__(self) -> bytes:
+        """The original AX.25 bytes."""
+        raw = self._raw
+        return raw if isinstance(raw, bytes) else bytes(raw)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LazyFrame):
+            return bytes(self) == bytes(other)
+        if isinstance(other, Frame):
+            return self.to_frame() == other
+        return NotImplemented
+
+    def __str__(self) -> str:
+        """Serialize the frame as TNC2 monitor format."""
+        if self._tnc2 is None:
+            self._tnc2 = _encode_tnc2(self)
+        return self._tnc2
+
+
+def find_frame_spans(
+    buffer: Union[bytes, bytearray, memoryview],
+    use_numpy: Optional[bool] = None,
+) -> Tuple[array, array]:
+    """
+    Locate every run of bytes between AX25_FLAG in a single pass.
+
+    :param buffer: flag delimited AX.25 data, such as a capture file.
+    :param use_numpy: scan with numpy; by default, numpy is used if installed.
+    :return: arrays of start and end offsets for each run (including FCS).
+    """
+    starts, ends = array("q"), array("q")
+    numpy = None
+    if use_numpy or use_numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            if use_numpy:
+                raise
+    if numpy is not None:
+        data = numpy.frombuffer(buffer, dtype=numpy.uint8)
+        flags = numpy.flatnonzero(data == AX25_FLAG)
+        run_starts = numpy.concatenate(([0], flags + 1)).astype(numpy.int64)
+        run_ends = numpy.concatenate((flags, [len(data)])).astype(numpy.int64)
+        non_empty = run_ends > run_starts
+        starts.frombytes(run_starts[non_empty].tobytes())
+        ends.frombytes(run_ends[non_empty].tobytes())
+        return starts, ends
+    for match in _FRAME_SPAN_REX.finditer(buffer):
+        start, end = match.span()
+        starts.append(start)
+        ends.append(end)
+    return starts, ends
+
+
+def valid_frame_spans(
+    buffer: Union[bytes, bytearray, memoryview],
+    starts: Sequence[int],
+    ends: Sequence[int],
+) -> Tuple[array, array]:
+    """
+    Check the FCS of each candidate span found by :func:`find_frame_spans`.
+
+    :return: arrays of start and end offsets of the frames whose FCS matched,
+        with the end offset excluding the FCS.
+    """
+    valid_starts, valid_ends = array("q"), array("q")
+    for start, end, ok in zip(starts, ends, FCS.verify_spans(buffer, starts, ends)):
+        if ok and end - start > 2:
+            valid_starts.append(start)
+            valid_ends.append(end - 2)
+    return valid_starts, valid_ends
+
+
+class ErrorPolicy(enum.Enum):
+    """How AX25BytestreamDecoder handles frames which cannot be decoded."""
+
+    RAISE = "raise"
+    """Raise ValueError; the next update resumes after the bad frame."""
+    DROP = "drop"
+    """Discard the frame and continue with the next one."""
+    RECORD = "record"
+    """Yield a FrameError in place of the frame and continue."""
+
+
+@define(frozen=True, slots=True)
+class FrameError:
+    """Yielded in place of a frame which could not be decoded (ErrorPolicy.RECORD)."""
+
+    data: bytes
+    """The bytes between flags, including the FCS."""
+    reason: str
+    """One of "bad_fcs", "runt", "oversize" or "decode_error"."""
+    message: str = ""
+
+
+@define
+class DecoderStats:
+    """Running counters for an AX25BytestreamDecoder."""
+
+    frames: int = 0
+    bad_fcs: int = 0
+    runts: int = 0
+    oversize: int = 0
+    decode_errors: int = 0
+
+
+# DecoderStats counter incremented for each FrameError reason
+_REJECT_COUNTERS = {
+    "bad_fcs": "bad_fcs",
+    "runt": "runts",
+    "oversize": "oversize",
+    "decode_error": "decode_errors",
+}
+# destination + source + control + FCS
+MIN_FRAME_LENGTH = 7 + 7 + Frame.CONTROL_SIZE + 2
+# generous upper bound for frames including FCS; AX.25 2.2 allows 2048 byte info
+MAX_FRAME_LENGTH = 4096
+
 
 @define
 class AX25BytestreamDecoder(GenericDecoder[Frame]):
     """Decode a generic AX25_FLAG delimited bytestream"""
 
-    _last_pframe: bytes = field(default=b"", init=False)
-
-    @staticmethod
-    def decode_frames(frame: bytes) -> Iterable[Frame]:
+    lazy: bool = field(default=False)
+    """If True, yield LazyFrame instead of Frame."""
+    error_policy: ErrorPolicy = field(default=ErrorPolicy.RAISE, converter=ErrorPolicy)
+    """What to do with bad FCS, oversize or undecodable frames."""
+    max_frame_length: Optional[int] = field(default=MAX_FRAME_LENGTH)
+    """Longer frames are discarded up to the next flag; None for no limit."""
+    stats: DecoderStats = field(factory=DecoderStats, init=False)
+
+    # Received bytes which have not been decoded yet. Consumed bytes are only
+    # trimmed from the front at the start of the next update, and bytearray
+    # makes that cheap, so partial frames are never copied.
+    _buffer: bytearray = field(factory=bytearray, init=False)
+    # Offset in _buffer where the next (partial) frame begins.
+    _frame_start: int = field(default=0, init=False)
+    # Offset in _buffer to resume looking for the closing flag.
+    _scan_offset: int = field(default=0, init=False)
+    # True while skipping the rest of an oversize frame.
+    _discarding: bool = field(default=False, init=False)
+
+    def decode_frames(self, frame: bytes) -> Iterable[Frame]:
         """
         Decode a single deframed byte chunk.
 
         :param frame: should represent a single higher level frame to
-            decode in some way.
+            decode in some way. May be a memoryview into the decoder's
+            buffer which is released afterwards, so it must not be retained.
         """
         if frame:
-            yield Frame.from_bytes(frame)
+            yield Frame.from_bytes(frame, lazy=self.lazy)
+
+    def _compact(self) -> None:
+        if self._frame_start:
+            del self._buffer[: self._frame_start]
+            self._scan_offset -= self._frame_start
+            self._frame_start = 0
+
+    def _reject(
+        self, packet: memoryview, reason: str, message: str
+    ) -> Iterable[FrameError]:
+        counter = _REJECT_COUNTERS[reason]
+        setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+        # fragments are never worth aborting the stream for
+        if self.error_policy is ErrorPolicy.RAISE and reason != "runt":
+            raise ValueError(message)
+        if self.error_policy is ErrorPolicy.RECORD:
+            yield FrameError(data=bytes(packet), reason=reason, message=message)
+
+    def _decode_packet(
+        self, packet: memoryview, fcs_ok: Optional[bool] = None
+    ) -> Iterable[Union[Frame, FrameError]]:
+        """Check and decode the bytes between two flags."""
+        if len(packet) < MIN_FRAME_LENGTH:
+            yield from self._reject(
+                packet, "runt", "Runt frame {!r}".format(bytes(packet))
+            )
+            return
+        if self.max_frame_length is not None and len(packet) > self.max_frame_length:
+            yield from self._reject(
+                packet,
+                "oversize",
+                "Frame of {} bytes exceeds max_frame_length".format(len(packet)),
+            )
+            return
+        if not (FCS.verify(packet) if fcs_ok is None else fcs_ok):
+            yield from self._reject(
+                packet,
+                "bad_fcs",
+                "FCS did not match for {!r}: {!r} != {!r}".format(
+                    bytes(packet[:-2]),
+                    FCS.compute(packet[:-2]),
+                    bytes(packet[-2:]),
+                ),
+            )
+            return
+        with packet[:-2] as payload:
+            try:
+                frames = list(self.decode_frames(payload))
+            except ValueError as exc:
+                if self.error_policy is ErrorPolicy.RAISE:
+                    raise
+                frames = list(self._reject(packet, "decode_error", str(exc)))
+            else:
+                self.stats.frames += len(frames)
+        yield from frames
+
+    def _check_oversize_partial(self) -> Iterable[FrameError]:
+        """Start discarding an unterminated frame once it grows too long."""
+        partial_len = len(self._buffer) - self._frame_start
+        if (
+            not self._discarding
+            and self.max_frame_length is not None
+            and partial_len > self.max_frame_length
+        ):
+            self._discarding = True
+            with memoryview(self._buffer)[
+                self._frame_start : self._frame_start + self.max_frame_length
+            ] as packet:
+                errors = list(
+                    self._reject(
+                        packet,
+                        "oversize",
+                        "Frame exceeds max_frame_length, discarding until next flag",
+                    )
+                )
+            yield from errors
+        if self._discarding:
+            self._frame_start = self._scan_offset = len(self._buffer)
 
-    def update(self, new_data: bytes) -> Iterable[Frame]:
+    def update(self, new_data: bytes) -> Iterable[Union[Frame, FrameError]]:
         """
         Decode the next sequence of bytes from the stream.
 
         :param new_data: the next bytes from the stream
         :return: an iterable of decoded frames
         """
-        packet_start = 0
-        data, self._last_pframe = self._last_pframe + new_data, b""
-        while 0 < (packet_start + 1) < len(data) or len(data) == 1:
-            if data[packet_start] != AX25_FLAG:
-                _logger.debug(
-                    "AX.25 frame did not start with flag {}, got {} "
-                    "instead (treating it as the start)".format(
-                        bin(AX25_FLAG),
-                        bin(data[packet_start]),
+        self._compact()
+        buf = self._buffer
+        buf += new_data
+        buf_len = len(buf)
+        while self._frame_start < buf_len:
+            if self._discarding:
+                # skip the rest of an oversize frame, up to the next flag
+                end_flag_at = buf.find(AX25_FLAG, self._scan_offset)
+                if end_flag_at < 0:
+                    self._frame_start = self._scan_offset = buf_len
+                    break
+                self._discarding = False
+                self._frame_start = self._scan_offset = end_flag_at
+            packet_start = self._frame_start
+            if self._scan_offset <= packet_start:
+                if buf[packet_start] != AX25_FLAG:
+                    _logger.debug(
+                        "AX.25 frame did not start with flag {}, got {} "
+                        "instead (treating it as the start)".format(
+                            bin(AX25_FLAG),
+                            bin(buf[packet_start]),
+                        )
                     )
-                )
-            while (packet_start + 1) < len(data) and data[packet_start] == AX25_FLAG:
                 # consume flag bytes until data is reached
-                packet_start += 1
+                while packet_start < buf_len and buf[packet_start] == AX25_FLAG:
+                    packet_start += 1
+                self._frame_start = self._scan_offset = packet_start
             # find the end of the packet
-            end_flag_at = data.find(AX25_FLAG, packet_start)
+            end_flag_at = buf.find(AX25_FLAG, self._scan_offset)
             if end_flag_at < 0:
-                # didn't find the end, so add to the buffer and continue
-                self._last_pframe = data[packet_start:]
+                # didn't find the end, wait for more data
+                self._scan_offset = buf_len
+                yield from self._check_oversize_partial()
                 break
+            self._frame_start = self._scan_offset = end_flag_at
+            if end_flag_at - packet_start <= 2:
+                # nothing between the flags but (at most) an FCS
+                continue
+            # release the view before yielding, so _buffer can be resized by
+            # the next update even if this generator is never finished
+            with memoryview(buf)[packet_start:end_flag_at] as packet:
+                frames = list(self._decode_packet(packet))
+            yield from frames
+
+    def update_bulk(self, new_data: bytes) -> Iterable[Union[Frame, FrameError]]:
+        """
+        Decode a large block of the stream, such as a whole capture file.
+
+        Yields the same frames as :meth:`update`, but locates every flag in
+        one pass with :func:`find_frame_spans` and checks the FCS of all
+        candidate frames with :meth:`FCS.verify_spans` before decoding.
+
+        :param new_data: the next bytes from the stream
+        :return: an iterable of decoded frames
+        """
+        self._compact()
+        buf = self._buffer
+        buf += new_data
+        offset = self._frame_start
+        if self._discarding:
+            # finish skipping an oversize frame before searching for spans
+            end_flag_at = buf.find(AX25_FLAG, self._scan_offset)
+            if end_flag_at < 0:
+                self._frame_start = self._scan_offset = len(buf)
+                return
+            self._discarding = False
+            offset = end_flag_at
+        with memoryview(buf)[offset:] as view:
+            starts, ends = find_frame_spans(view)
+            partial_start = None
+            if starts and ends[-1] + offset == len(buf):
+                # the last span has no closing flag yet
+                partial_start = starts.pop() + offset
+                ends.pop()
+            fcs_ok = FCS.verify_spans(view, starts, ends)
+        for start, end, ok in zip(starts, ends, fcs_ok):
+            self._frame_start = self._scan_offset = end + offset
+            if end - start <= 2:
+                continue
+            with memoryview(buf)[start + offset : end + offset] as packet:
+                frames = list(self._decode_packet(packet, fcs_ok=ok))
+            yield from frames
+        if partial_start is not None:
+            self._frame_start, self._scan_offset = partial_start, len(buf)
+            yield from self._check_oversize_partial()
+        else:
+            self._frame_start = self._scan_offset = len(buf)
+
+    def flush(self) -> Iterable[Union[Frame, FrameError]]:
+        """
+        Call when the stream is closing to decode any final buffered bytes.
+
+        An unterminated final frame is checked like any other if it ends with
+        a valid FCS. Otherwise it is rejected as a runt, except under
+        ErrorPolicy.RAISE, which decodes it as a frame without FCS.
+        """
+        buf, self._buffer = self._buffer, bytearray()
+        remaining = bytes(buf[self._frame_start :]).lstrip(AX25_FLAG_B)
+        self._frame_start = self._scan_offset = 0
+        if self._discarding:
+            self._discarding = False
+            return
+        if not remaining:
+            return
+        with memoryview(remaining) as packet:
+            if len(packet) >= MIN_FRAME_LENGTH and FCS.verify(packet):
+                yield from self._decode_packet(packet, fcs_ok=True)
+            elif self.error_policy is ErrorPolicy.RAISE:
+                frames = list(self.decode_frames(packet))
+                self.stats.frames += len(frames)
+                yield from frames
             else:
-                fcs = data[end_flag_at - 2 : end_flag_at] or None
-                for frame in self.decode_frames(data[packet_start : end_flag_at - 2]):
-                    calc_fcs = FCS.from_bytes(bytes(frame)).digest()
-                    if calc_fcs != fcs:
-                        raise ValueError(
-                            "FCS did not match for {}: {!r} != {!r}".format(
-                                frame, calc_fcs, fcs
-                            )
-                        )
-                    yield frame
-                packet_start = end_flag_at
-
-    def flush(self) -> Iterable[Frame]:
-        """Call when the stream is closing to decode any final buffered bytes."""
-        if self._last_pframe:
-            yield from self.decode_frames(self._last_pframe)
-        return
+                yield from self._reject(
+                    packet, "runt", "Unterminated frame {!r}".format(remaining)
+                )
@@ -0,0 +1,228 @@
+"""Manage many FrameDecodeProtocol connections on one event loop."""
+import asyncio
+import logging
+from typing import (
+    Any,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    SupportsBytes,
+    Tuple,
+)
+
+from attrs import define, field
+
+from .decode import EOF, FrameDecodeProtocol
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+_logger = logging.getLogger(__name__)
+
+# Coroutine function which establishes a connection, such as
+# ``lambda: loop.create_connection(TNC2Protocol, host, port)``
+ConnectFactory = Callable[
+    [], Awaitable[Tuple[asyncio.BaseTransport, FrameDecodeProtocol]]
+]
+
+
+@define
+class LinkStats:
+    """Counters for a single FrameHub link."""
+
+    frames_in: int = 0
+    frames_out: int = 0
+    connects: int = 0
+    """Successful connections, including reconnects."""
+    failures: int = 0
+    """Failed connection attempts and lost connections."""
+    last_error: Optional[str] = None
+
+
+@define(frozen=True, slots=True)
+class LinkFrame:
+    """A frame received by a FrameHub, tagged with the name of its link."""
+
+    link: str
+    frame: Any
+
+
+@define
+class Link:
+    """A named connection managed by a FrameHub."""
+
+    name: str
+    connect: ConnectFactory
+    stats: LinkStats = field(factory=LinkStats)
+    protocol: Optional[FrameDecodeProtocol] = field(default=None)
+    """The active protocol, or None while (re)connecting."""
+    _task: Optional[asyncio.Future] = field(default=None, repr=False)
+
+    @property
+    def connected(self) -> bool:
+        return (
+            self.protocol is not None
+            and self.protocol.transport is not None
+            and not self.protocol.transport.is_closing()
+        )
+
+
+@define
+class FrameHub:
+    """
+    Own many FrameDecodeProtocol links and merge their frames into one stream.
+
+    Each link is read by its own task, which takes at most `max_batch` frames
+    before letting the other links run, so one busy link cannot starve the
+    rest. Lost or failed connections are retried with exponential backoff.
+
+    Use as an async context manager, or call :meth:`start` and :meth:`close`.
+    """
+
+    max_batch: int = field(default=32)
+    """Frames taken from one link before yielding to the others."""
+    max_queue_size: int = field(default=0)
+    """
+    Bound on the merged queue; 0 for no limit.
+
+    Also applied to the queue of each link protocol which has no bound of its
+    own, so while the merged queue is full, links stop reading from their
+    transports.
+    """
+    reconnect_delay: float = field(default=1.0)
+    """Initial delay before reconnecting, doubled after each failure."""
+    max_reconnect_delay: float = field(default=60.0)
+    links: Dict[str, Link] = field(factory=dict, init=False)
+    frames: Optional[asyncio.Queue] = field(default=None, init=False)
+    """Merged queue of LinkFrame, created by :meth:`start`."""
+    _running: bool = field(default=False, init=False)
+
+    def add_link(self, name: str, connect: ConnectFactory) -> Link:
+        """
+        Add a link; it is connected immediately if the hub is running.
+
+        :param name: unique name used to tag frames and select links.
+        :param connect: coroutine function returning ``(transport, protocol)``.
+        """
+        if name in self.links:
+            raise ValueError("Link {!r} already exists".format(name))
+        link = self.links[name] = Link(name=name, connect=connect)
+        if self._running:
+            link._task = asyncio.ensure_future(self._run_link(link))
+        return link
+
+    async def remove_link(self, name: str) -> None:
+        """Disconnect and forget the named link."""
+        await self._stop_link(self.links.pop(name))
+
+    async def start(self) -> None:
+        """Connect all links and start merging their frames."""
+        if self._running:
+            return
+        if self.frames is None:
+            self.frames = asyncio.Queue(maxsize=self.max_queue_size)
+        self._running = True
+        for link in self.links.values():
+            link._task = asyncio.ensure_future(self._run_link(link))
+
+    async def close(self) -> None:
+        """Disconnect all links and end :meth:`read` once the queue is empty."""
+        self._running = False
+        for link in list(self.links.values()):
+            await self._stop_link(link)
+        if self.frames is not None and not self.frames.full():
+            # wake readers waiting on an empty queue; a full queue is drained
+            # by readers, which then see that the hub is no longer running
+            self.frames.put_nowait(EOF)
+
+    async def __aenter__(self) -> "FrameHub":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    @staticmethod
+    async def _stop_link(link: Link) -> None:
+        task, link._task = link._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if link.protocol is not None and link.protocol.transport is not None:
+            link.protocol.transport.close()
+        link.protocol = None
+
+    async def _run_link(self, link: Link) -> None:
+        delay = self.reconnect_delay
+        while self._running:
+            try:
+                _, link.protocol = await link.connect()
+            except (OSError, asyncio.TimeoutError) as exc:
+                link.stats.failures += 1
+                link.stats.last_error = repr(exc)
+                _logger.warning("Link %s failed to connect: %r", link.name, exc)
+            else:
+                link.stats.connects += 1
+                delay = self.reconnect_delay
+                await self._pump(link)
+                link.protocol = None
+                link.stats.failures += 1
+                link.stats.last_error = "connection lost"
+                _logger.warning("Link %s lost connection", link.name)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _pump(self, link: Link) -> None:
+        protocol = link.protocol
+        assert protocol is not None
+        frames = self.frames
+        assert frames is not None
+        if self.max_queue_size and not protocol.max_queue_size:
+            # pause the transport while the merged queue is full
+            protocol.max_queue_size = self.max_queue_size
+        async for batch in protocol.iter_batches(max_frames=self.max_batch):
+            for frame in batch:
+                await frames.put(LinkFrame(link=link.name, frame=frame))
+            link.stats.frames_in += len(batch)
+            # let the other links have a turn
+            await asyncio.sleep(0)
+
+    async def read(self) -> AsyncIterable[LinkFrame]:
+        """Iterate through frames received on all links."""
+        if self.frames is None:
+            raise RuntimeError("FrameHub is not started. Hint: did you call start()?")
+        frames = self.frames
+        while self._running or not frames.empty():
+            link_frame = await frames.get()
+            if link_frame is EOF:
+                if self._running:
+                    # left over from before the hub was restarted
+                    continue
+                # leave EOF for any other readers
+                frames.put_nowait(EOF)
+                return
+            yield link_frame
+
+    def write(self, frame: SupportsBytes, links: Optional[Iterable[str]] = None) -> int:
+        """
+        Write a frame to the selected links.
+
+        :param links: names of the links to write to; all links if None.
+        :return: number of connected links the frame was written to.
+        """
+        written = 0
+        for name in self.links if links is None else links:
+            link = self.links[name]
+            if link.connected:
+                link.protocol.write(frame)
+                link.stats.frames_out += 1
+                written += 1
+        return written
@@ -0,0 +1,234 @@
+"""Decode large capture files on several cores."""
+import collections
+import concurrent.futures
+import mmap
+import os
+import re
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+import attr
+from attrs import define, field
+
+from .capture import FORMATS
+from .frame import AX25_FLAG_B, AX25BytestreamDecoder, DecoderStats, Frame, FrameError
+from .tnc2 import TNC2Decode
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+# smallest chunk worth sending to a worker
+MIN_CHUNK_SIZE = 1024 * 1024
+_LINE_END_REX = re.compile(rb"\r\n|[\r\n]")
+
+
+@define
+class CaptureSummary:
+    """Aggregate counts for a capture, which can be merged across chunks."""
+
+    frames: int = 0
+    sources: Dict[str, int] = field(factory=collections.Counter)
+    """Frames sent by each source address, in TNC2 format."""
+    destinations: Dict[str, int] = field(factory=collections.Counter)
+    """Frames sent to each destination address, in TNC2 format."""
+    stats: DecoderStats = field(factory=DecoderStats)
+    """Decoder counters (AX.25 captures only)."""
+
+    def merge(self, other: "CaptureSummary") -> "CaptureSummary":
+        """Add the counts of `other` to this summary."""
+        self.frames += other.frames
+        self.sources.update(other.sources)
+        self.destinations.update(other.destinations)
+        for name, value in attr.asdict(other.stats).items():
+            setattr(self.stats, name, getattr(self.stats, name) + value)
+        return self
+
+
+def split_capture(
+    path: Union[str, "os.PathLike[str]"],
+    format: str = "ax25",
+    chunk_size: int = MIN_CHUNK_SIZE,
+) -> List[Tuple[int, int]]:
+    """
+    Split a capture into (start, end) byte ranges of about `chunk_size`.
+
+    AX.25 ranges start and end on a flag, which is shared with the next
+    range, so every frame falls entirely within one range. TNC2 ranges end
+    just past a line ending.
+    """
+    if format not in FORMATS:
+        raise ValueError(
+            "Unknown format {!r}, expected one of {!r}".format(format, FORMATS)
+        )
+    size = os.path.getsize(path)
+    if not size:
+        return []
+    spans = []
+    start = 0
+    with open(path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        while start + chunk_size < size:
+            if format == "ax25":
+                end = data.find(AX25_FLAG_B, start + chunk_size)
+                if end >= 0:
+                    # include the closing flag of the last frame
+                    end += 1
+            else:
+                match = _LINE_END_REX.search(data, start + chunk_size)
+                end = -1 if match is None else match.end()
+            if end < 0:
+                break
+            spans.append((start, end))
+            start = end - 1 if format == "ax25" else end
+        spans.append((start, size))
+    return spans
+
+
+def _decode_span(
+    path: Union[str, "os.PathLike[str]"],
+    format: str,
+    start: int,
+    end: int,
+    final: bool,
+    decoder_kwargs: Dict[str, Any],
+) -> Tuple[List[Union[Frame, FrameError]], Optional[DecoderStats]]:
+    """
+    Decode one range of a capture; runs in a worker process.
+
+    :return: the frames, and the decoder counters for AX.25 captures.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    if format == "tnc2":
+        tnc2_decoder = TNC2Decode(**decoder_kwargs)
+        frames = list(tnc2_decoder.update(data))
+        if final:
+            frames.extend(tnc2_decoder.flush())
+        return frames, None
+    decoder = AX25BytestreamDecoder(**decoder_kwargs)
+    # like CaptureReader, leave a final frame without closing flag alone,
+    # as the capture may still be being written
+    return list(decoder.update_bulk(data)), decoder.stats
+
+
+def _summarize_span(
+    path: Union[str, "os.PathLike[str]"],
+    format: str,
+    start: int,
+    end: int,
+    final: bool,
+    decoder_kwargs: Dict[str, Any],
+) -> CaptureSummary:
+    """Count the frames in one range of a capture; runs in a worker process."""
+    frames, stats = _decode_span(path, format, start, end, final, decoder_kwargs)
+    summary = CaptureSummary()
+    if stats is not None:
+        summary.stats = stats
+    for frame in frames:
+        if not isinstance(frame, FrameError):
+            summary.frames += 1
+            summary.sources[str(frame.source)] += 1
+            summary.destinations[str(frame.destination)] += 1
+    return summary
+
+
+def _map_spans(
+    fn: Any,
+    path: Union[str, "os.PathLike[str]"],
+    format: str,
+    workers: Optional[int],
+    chunk_size: Optional[int],
+    executor: Optional[concurrent.futures.Executor],
+    decoder_kwargs: Dict[str, Any],
+) -> Iterator[Any]:
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(MIN_CHUNK_SIZE, os.path.getsize(path) // (workers * 4))
+    spans = split_capture(path, format, chunk_size)
+    if executor is not None:
+        yield from _run_spans(
+            executor, fn, path, format, spans, decoder_kwargs, workers * 2
+        )
+        return
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from _run_spans(
+            pool, fn, path, format, spans, decoder_kwargs, workers * 2
+        )
+
+
+def _run_spans(
+    executor: concurrent.futures.Executor,
+    fn: Any,
+    path: Union[str, "os.PathLike[str]"],
+    format: str,
+    spans: List[Tuple[int, int]],
+    decoder_kwargs: Dict[str, Any],
+    max_pending: int,
+) -> Iterator[Any]:
+    """Map `fn` over `spans` in order, with at most `max_pending` in flight."""
+    pending: Deque[concurrent.futures.Future] = collections.deque()
+    for index, (start, end) in enumerate(spans):
+        final = index == len(spans) - 1
+        pending.append(
+            executor.submit(fn, path, format, start, end, final, decoder_kwargs)
+        )
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def decode_capture(
+    path: Union[str, "os.PathLike[str]"],
+    format: str = "ax25",
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    executor: Optional[concurrent.futures.Executor] = None,
+    **decoder_kwargs: Any,
+) -> Iterator[Union[Frame, FrameError]]:
+    """
+    Decode a whole capture file in parallel, yielding frames in file order.
+
+    The file is split on frame boundaries (see :func:`split_capture`) and each
+    range is decoded by AX25BytestreamDecoder or TNC2Decode in a worker,
+    which opens the file itself, so only the decoded frames are sent back.
+    An AX.25 capture ending without a closing flag is decoded up to the last
+    complete frame.
+
+    :param format: "ax25" for flag delimited frames or "tnc2" for lines.
+    :param workers: processes to start; defaults to the number of CPUs.
+        With `executor`, only limits how many ranges are in flight.
+    :param chunk_size: approximate bytes per range; by default the file is
+        split into four ranges per worker.
+    :param executor: use this executor instead of a new process pool.
+    :param decoder_kwargs: passed to the decoder, e.g. ``error_policy``.
+    """
+    for frames, _ in _map_spans(
+        _decode_span, path, format, workers, chunk_size, executor, decoder_kwargs
+    ):
+        yield from frames
+
+
+def summarize_capture(
+    path: Union[str, "os.PathLike[str]"],
+    format: str = "ax25",
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    executor: Optional[concurrent.futures.Executor] = None,
+    **decoder_kwargs: Any,
+) -> CaptureSummary:
+    """
+    Count the frames of a capture file in parallel.
+
+    Like :func:`decode_capture`, but each worker reduces its range to a
+    CaptureSummary, so frames never leave the worker.
+    """
+    summary = CaptureSummary()
+    for part in _map_spans(
+        _summarize_span, path, format, workers, chunk_size, executor, decoder_kwargs
+    ):
+        summary.merge(part)
+    return summary
@@ -1,10 +1,14 @@
 """asyncio Protocol for extracting individual frames from CRLF-delimited TNC2."""
 import logging
-from typing import Iterable
+import os
+import zlib
+from types import TracebackType
+from typing import Any, BinaryIO, Iterable, Optional, Type, Union
 
 from attrs import define, field
 
-from .frame import Frame
+from . import address
+from .frame import Frame, LazyFrame
 from .decode import FrameDecodeProtocol, GenericDecoder
 
 __author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
@@ -14,6 +18,34 @@ __license__ = "Apache License, Version 2.0"
 
 log = logging.getLogger(__name__)
 
+MAX_LINE_LENGTH = 4096
+COMPRESSION_BY_SUFFIX = {".gz": "gzip", ".zst": "zstd"}
+
+
+def frame_from_tnc2(line: bytes) -> Frame:
+    """
+    Decode a frame from one line of TNC2 monitor format, given as bytes.
+
+    Gives the same Frame as ``Frame.from_str(line.decode("latin1"))``, but
+    splits the bytes directly and takes each Address from an interning cache
+    (see :func:`ax253.address.set_cache_size`), so the repeated callsigns
+    of a live feed are only parsed and validated once.
+
+    Target: 100,000 lines per second through TNC2Decode on one desktop core
+    with typical APRS-IS traffic, about twice the rate of ``Frame.from_str``.
+    """
+    from_tnc2 = address._cached_from_tnc2
+    source, gt, rem = line.partition(b">")
+    address_field, colon, info = rem.partition(b":")
+    destination, *path = address_field.split(b",")
+    last = len(path) - 1
+    return Frame._ui_unchecked(
+        destination=from_tnc2(destination, False),
+        source=from_tnc2(source, not path),
+        path=[from_tnc2(p, i == last) for i, p in enumerate(path)],
+        info=info,
+    )
+
 
 @define
 class TNC2Decode(GenericDecoder[Frame]):
@@ -21,23 +53,101 @@ class TNC2Decode(GenericDecoder[Frame]):
     Decode packets in CR-LF delimited TNC2 monitor format.
 
     Example: SENDER>DEST,PATH:data for the packet
+
+    Lines may be split across any number of updates.
     """
 
+    max_line_length: Optional[int] = field(default=MAX_LINE_LENGTH)
+    """Longer lines are discarded up to the next line ending; None for no limit."""
+
+    # Received bytes which have not been decoded yet, trimmed from the front
+    # at the start of the next update (see AX25BytestreamDecoder).
+    _buffer: bytearray = field(factory=bytearray, init=False)
+    # Offset in _buffer where the next (partial) line begins.
+    _line_start: int = field(default=0, init=False)
+    # Offset in _buffer to resume looking for the line ending.
+    _scan_offset: int = field(default=0, init=False)
+    # True while skipping the rest of an overlong line.
+    _discarding: bool = field(default=False, init=False)
+
     @staticmethod
     def decode_frames(frame: bytes) -> Iterable[Frame]:
         try:
-            yield Frame.from_str(frame.decode("latin1"))
+            yield frame_from_tnc2(frame)
         except Exception:
             log.debug("Ignore frame decode error %r", frame, exc_info=True)
 
-    def update(self, new_data: bytes) -> Iterable[Frame]:
-        packets = new_data.splitlines()
-        for packet in packets:
-            if packet.strip().startswith(b"#"):
-                log.debug(packet)  # log comment
+    def _decode_lines(self, lines: Iterable[bytes]) -> Iterable[Frame]:
+        max_line_length = self.max_line_length
+        for line in lines:
+            if max_line_length is not None and len(line) > max_line_length:
+                log.debug(
+                    "Discard line longer than %d bytes: %r...",
+                    max_line_length,
+                    line[:32],
+                )
                 continue
-            if packet:
-                yield from self.decode_frames(packet)
+            first = line[:1]
+            if first == b"#" or first.isspace():
+                stripped = line.strip()
+                if stripped.startswith(b"#"):
+                    log.debug(line)  # log comment
+                    continue
+                if not stripped:
+                    continue
+            elif not first:
+                continue
+            yield from self.decode_frames(line)
+
+    def update(self, new_data: bytes) -> Iterable[Frame]:
+        """
+        Decode the next sequence of bytes from the stream.
+
+        :param new_data: the next bytes from the stream
+        :return: an iterable of decoded frames
+        """
+        if self._line_start:
+            del self._buffer[: self._line_start]
+            self._scan_offset -= self._line_start
+            self._line_start = 0
+        buf = self._buffer
+        buf += new_data
+        scan_offset, self._scan_offset = self._scan_offset, len(buf)
+        # only the new data can hold a line ending
+        last_end = max(buf.rfind(b"\n", scan_offset), buf.rfind(b"\r", scan_offset))
+        if last_end < 0:
+            if (
+                self.max_line_length is not None
+                and len(buf) - self._line_start > self.max_line_length
+            ):
+                log.debug(
+                    "Discard line longer than %d bytes: %r...",
+                    self.max_line_length,
+                    bytes(buf[self._line_start : self._line_start + 32]),
+                )
+                self._discarding = True
+                self._line_start = len(buf)
+            return
+        # split every complete line at once; CR-LF leaves an empty line
+        # behind when it is split across updates, which is skipped
+        with memoryview(buf) as view:
+            lines = bytes(view[self._line_start : last_end]).splitlines()
+        self._line_start = last_end + 1
+        if self._discarding:
+            # the first line is the rest of an overlong line
+            self._discarding = False
+            del lines[:1]
+        yield from self._decode_lines(lines)
+
+    def flush(self) -> Iterable[Frame]:
+        """Call when the stream is closing to decode the final unterminated line."""
+        buf, self._buffer = self._buffer, bytearray()
+        line_start = self._line_start
+        self._line_start = self._scan_offset = 0
+        if self._discarding:
+            self._discarding = False
+        elif len(buf) > line_start:
+            yield from self._decode_lines([bytes(buf[line_start:])])
 
 
 @define
@@ -46,6 +156,163 @@ class TNC2Protocol(FrameDecodeProtocol[Frame]):
 
     decoder: TNC2Decode = field(factory=TNC2Decode)
 
-    def write(self, frame: Frame) -> None:
-        """Write the Frame to the transport."""
-        return self.transport.write(str(frame).encode("latin1") + b"\r\n")
+    def encode_frame(self, frame: Frame) -> bytes:
+        """Serialize the Frame as a CR-LF terminated TNC2 line."""
+        line = bytearray()
+        _append_tnc2(line, frame)
+        return bytes(line)
+
+
+def _append_tnc2(buf: bytearray, frame: Union[Frame, LazyFrame]) -> None:
+    """Append `frame` to `buf` as a CR-LF terminated TNC2 line."""
+    buf += frame.source._encode_tnc2()
+    buf += b">"
+    buf += frame.destination._encode_tnc2()
+    for hop in frame.path or ():
+        buf += b","
+        buf += hop._encode_tnc2()
+    buf += b":"
+    # bytes() is free for bytes, and handles info types with __bytes__
+    buf += bytes(frame.info)
+    buf += b"\r\n"
+
+
+def _compressor(compression: Optional[str]) -> Any:
+    if compression is None:
+        return None
+    if compression == "gzip":
+        return zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    if compression == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor().compressobj()
+    raise ValueError(
+        "Unknown compression {!r}, expected one of {!r}".format(
+            compression, sorted(COMPRESSION_BY_SUFFIX.values())
+        )
+    )
+
+
+@define
+class TNC2Writer:
+    """
+    Serialize frames as CR-LF terminated TNC2 lines to a binary file or transport.
+
+    Lines are built from the cached TNC2 encoding of each Address into one
+    reusable buffer, which is handed to `sink` whenever it holds
+    `buffer_size` bytes. With `compression` set to "gzip" or "zstd" (the
+    latter requires the optional zstandard package) the output is a single
+    compressed stream.
+
+    Use as a context manager, or call :meth:`close` to write the remaining
+    data and end the compressed stream.
+    """
+
+    sink: Any
+    """Object with a ``write(bytes)`` method, such as a file or asyncio transport."""
+    compression: Optional[str] = field(default=None)
+    buffer_size: int = field(default=64 * 1024)
+    frames_written: int = field(default=0, init=False)
+    _buffer: bytearray = field(factory=bytearray, init=False)
+    _compressor: Any = field(init=False)
+    # sinks opened by `open` are closed along with the writer
+    _owns_sink: bool = field(default=False, init=False)
+
+    @_compressor.default
+    def _compressor_factory(self) -> Any:
+        return _compressor(self.compression)
+
+    @classmethod
+    def open(
+        cls,
+        path: Union[str, "os.PathLike[str]"],
+        compression: Optional[str] = None,
+        append: bool = False,
+        **kwargs: Any,
+    ) -> "TNC2Writer":
+        """
+        Open a capture file for writing.
+
+        :param compression: "gzip" or "zstd"; if None, inferred from the
+            ``.gz`` or ``.zst`` suffix of `path`.
+        :param append: add to an existing file instead of replacing it. A
+            compressed stream is appended as a new frame/member.
+        """
+        if compression is None:
+            compression = COMPRESSION_BY_SUFFIX.get(os.path.splitext(path)[1])
+        sink: BinaryIO = open(path, "ab" if append else "wb")
+        writer = cls(sink=sink, compression=compression, **kwargs)
+        writer._owns_sink = True
+        return writer
+
+    def write(self, frame: Union[Frame, LazyFrame]) -> None:
+        """Write one frame."""
+        _append_tnc2(self._buffer, frame)
+        self.frames_written += 1
+        if len(self._buffer) >= self.buffer_size:
+            self._drain()
+
+    def write_many(self, frames: Iterable[Union[Frame, LazyFrame]]) -> int:
+        """
+        Write every frame from an iterable.
+
+        :return: the number of frames written.
+        """
+        buf = self._buffer
+        buffer_size = self.buffer_size
+        count = 0
+        for frame in frames:
+            _append_tnc2(buf, frame)
+            count += 1
+            if len(buf) >= buffer_size:
+                self._drain()
+        self.frames_written += count
+        return count
+
+    def _drain(self) -> None:
+        buf = self._buffer
+        if not buf:
+            return
+        data = bytes(buf)
+        del buf[:]
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        if data:
+            self.sink.write(data)
+
+    def flush(self) -> None:
+        """Hand all buffered lines to the sink, keeping the stream open."""
+        self._drain()
+        if self._compressor is not None:
+            if self.compression == "gzip":
+                data = self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            else:
+                import zstandard
+
+                data = self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            if data:
+                self.sink.write(data)
+        if hasattr(self.sink, "flush"):
+            self.sink.flush()
+
+    def close(self) -> None:
+        """Write the remaining data and end the compressed stream."""
+        self._drain()
+        if self._compressor is not None:
+            compressor, self._compressor = self._compressor, None
+            self.sink.write(compressor.flush())
+        if self._owns_sink:
+            self.sink.close()
+        elif hasattr(self.sink, "flush"):
+            self.sink.flush()
+
+    def __enter__(self) -> "TNC2Writer":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
@@ -0,0 +1,14 @@
+"""
+Helpers shared by the test modules.
+"""
+from ax253.fcs import FCS
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+def flagged(frame) -> bytes:
+    """Encode `frame` as it appears in a raw capture: flag delimited with FCS."""
+    raw = bytes(frame)
+    return b"~" + raw + FCS.compute(raw) + b"~"
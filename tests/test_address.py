@@ -1,6 +1,6 @@
 import pytest
 
-from ax253 import Address
+from ax253 import address, Address
 
 
 __author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"  # NOQA pylint: disable=R0801
@@ -39,3 +39,35 @@ def test_address_from_ax25(ax25_bytes, exp_address):
     a = Address.from_bytes(ax25_bytes)
     assert a == exp_address
     assert Address.from_str(str(a)) == exp_address
+
+
+def test_address_encoding_cached():
+    a = Address.from_str("N0CALL-1*")
+    assert bytes(a) is bytes(a)
+    assert str(a) is str(a)
+    assert a == Address(b"N0CALL", 1, True, True)
+    assert hash(a) == hash(Address(b"N0CALL", 1, True, True))
+    assert bytes(a.evolve(ssid=2)) == b"\x9c`\x86\x82\x98\x98\xe5"
+
+
+def test_address_interning():
+    address.cache_clear()
+    a = Address.from_bytes(b"\x9c`\x86\x82\x98\x98b")
+    assert Address.from_bytes(bytearray(b"\x9c`\x86\x82\x98\x98b")) is a
+    assert Address.from_str("WIDE1-1", a7_hldc=True) is Address.from_str(
+        "WIDE1-1", a7_hldc=True
+    )
+    assert Address.from_str("WIDE1-1") is not Address.from_str("WIDE1-1", a7_hldc=True)
+    info = address.cache_info()
+    assert (info["bytes"].hits, info["bytes"].misses) == (1, 1)
+    assert (info["str"].hits, info["str"].misses) == (2, 2)
+    # kwargs bypass the cache
+    assert Address.from_bytes(b"\x9c`\x86\x82\x98\x98b", ssid=2).ssid == 2
+
+
+def test_address_interning_disabled():
+    address.set_cache_size(0)
+    try:
+        assert Address.from_str("WIDE1-1") is not Address.from_str("WIDE1-1")
+    finally:
+        address.set_cache_size()
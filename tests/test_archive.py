@@ -0,0 +1,127 @@
+import os
+
+import pytest
+
+from ax253 import Frame
+from ax253.archive import ArchiveReader, ArchiveWriter, INDEX_SUFFIX
+
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+FRAMES = [
+    Frame.ui(
+        "APRS",
+        "N{}CALL-{}".format(i % 3, i % 2),
+        ["WIDE1-1"],
+        info="packet {}".format(i),
+    )
+    for i in range(20)
+]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    path = str(tmp_path / "frames.ax253")
+    with ArchiveWriter(path, block_size=4) as writer:
+        for i, frame in enumerate(FRAMES[:10]):
+            writer.write(frame, timestamp=1000.0 + i)
+    # reopening continues the same archive
+    with ArchiveWriter(path, block_size=100) as writer:
+        for i, frame in enumerate(FRAMES[10:], start=10):
+            writer.write(frame, timestamp=1000.0 + i)
+    return path
+
+
+def test_archive_query(archive):
+    reader = ArchiveReader(archive)
+    assert len(reader) == 20
+    assert [r.frame for r in reader] == FRAMES
+    assert reader.callsigns == ["APRS", "N0CALL", "N1CALL", "N2CALL"]
+    records = list(reader.query(start=1005.0, end=1008.0))
+    assert [r.timestamp for r in records] == [1005.0, 1006.0, 1007.0]
+    assert [r.frame for r in records] == FRAMES[5:8]
+    assert [r.frame for r in reader.query(callsign="n1call")] == FRAMES[1::3]
+    assert [r.frame for r in reader.query(callsign="N0CALL-1", end=1010.0)] == [
+        FRAMES[3],
+        FRAMES[9],
+    ]
+    assert list(reader.query(callsign="N9CALL")) == []
+    with open(archive, "rb") as f:
+        f.seek(records[0].offset)
+        assert FRAMES[5].info in f.read(100)
+
+
+def test_archive_lazy(archive):
+    reader = ArchiveReader(archive, lazy=True)
+    assert [r.frame for r in reader.query(start=1018.0)] == FRAMES[18:]
+
+
+def test_archive_recover(archive):
+    # records written after the last sync, the last one incomplete
+    with open(archive, "ab") as f:
+        f.write(b"\x00" * 3)
+    os.remove(archive + INDEX_SUFFIX)
+    assert len(ArchiveReader(archive)) == 20
+    with ArchiveWriter(archive) as writer:
+        writer.write(FRAMES[0], timestamp=2000.0)
+    reader = ArchiveReader(archive)
+    assert [r.frame for r in reader.query(start=1019.0)] == [FRAMES[19], FRAMES[0]]
+
+
+def test_archive_rejects_bad_frame(archive):
+    size = os.path.getsize(archive)
+    with ArchiveWriter(archive) as writer:
+        with pytest.raises(ValueError):
+            writer.write(b"short", timestamp=2000.0)
+        with pytest.raises(ValueError):
+            writer.write(b"\xff" * 20, timestamp=2000.0)
+        writer.write(FRAMES[0], timestamp=2001.0)
+    assert os.path.getsize(archive) == size + 12 + len(bytes(FRAMES[0]))
+    reader = ArchiveReader(archive)
+    assert [r.frame for r in reader.query(start=1019.0)] == [FRAMES[19], FRAMES[0]]
+
+
+def test_archive_sync_batching(tmp_path):
+    path = str(tmp_path / "frames.ax253")
+    writer = ArchiveWriter(path, block_size=2, sync_records=3, sync_interval=60)
+    writer.write(FRAMES[0])
+    writer.write(FRAMES[1])
+    assert len(ArchiveReader(path)) == 0
+    writer.write(FRAMES[2])
+    assert len(ArchiveReader(path)) == 3
+    with open(path + INDEX_SUFFIX, "rb") as f:
+        index = f.read()
+    # header and the first full block
+    assert index.count(b"\n") == 2
+    writer.write(FRAMES[3])
+    assert len(ArchiveReader(path)) == 3
+    writer.close()
+    assert len(ArchiveReader(path)) == 4
+    with open(path + INDEX_SUFFIX, "rb") as f:
+        # the index is only ever appended to
+        assert f.read().startswith(index)
+
+
+def test_archive_index_ahead_of_data(archive):
+    # lose the data behind the last full block, but keep its index line
+    blocks = ArchiveReader(archive)._index.blocks
+    with open(archive, "r+b") as f:
+        f.truncate(blocks[-2][1] - 5)
+    with ArchiveWriter(archive) as writer:
+        writer.write(FRAMES[0], timestamp=2000.0)
+    reader = ArchiveReader(archive)
+    frames = [r.frame for r in reader]
+    assert frames[-1] == FRAMES[0]
+    assert frames[:-1] == FRAMES[: len(frames) - 1]
+
+
+def test_archive_not_an_archive(tmp_path):
+    path = tmp_path / "other"
+    path.write_bytes(b"not an archive")
+    with pytest.raises(ValueError):
+        ArchiveReader(str(path))
+    with pytest.raises(ValueError):
+        ArchiveWriter(str(path))
@@ -0,0 +1,68 @@
+import pytest
+
+from ax253 import Frame, FrameBatch
+
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+RAW_FRAMES = [
+    b"\x82\xa0\xa4\xa6@@`\x9c`\x86\x82\x98\x98`\xae\x92\x88\x8ab@c\x03\xf0foo bar baz",
+    (
+        b"\x82\xa0\xb4`lr`\x9c`\x86\x82\x98\x98`\xae\x92\x88\x8ab@b\x8c\x9e\x9e\x88\xa0"
+        b"@\xe1\x03\xf0digi'd 1"
+    ),
+    b"\x82\xa0\xa4\xa6@@`\x9c`\x86\x82\x98\x98a\x43",
+]
+
+
+def test_FrameBatch_from_frames():
+    batch = FrameBatch.from_frames(RAW_FRAMES)
+    assert len(batch) == 3
+    assert list(batch) == [Frame.from_bytes(raw) for raw in RAW_FRAMES]
+    assert batch.destination_callsign(1) == b"APZ069"
+    assert batch.source_callsign(2) == b"N0CALL"
+    assert list(batch.destination_ssid) == [0, 0, 0]
+    assert list(batch.path_length) == [1, 2, 0]
+    assert list(batch.control) == [0x03, 0x03, 0x43]
+    assert list(batch.pid) == [0xF0, 0xF0, -1]
+    assert batch.info(1) == b"digi'd 1"
+    assert batch.info(2) == b""
+    assert bytes(batch.frame(0, lazy=True)) == RAW_FRAMES[0]
+
+
+def test_FrameBatch_from_buffer():
+    buffer = b"~~".join(RAW_FRAMES)
+    starts, ends, offset = [], [], 0
+    for raw in RAW_FRAMES:
+        starts.append(offset)
+        ends.append(offset + len(raw))
+        offset += len(raw) + 2
+    batch = FrameBatch.from_buffer(buffer, starts, ends)
+    assert batch[-1] == Frame.from_bytes(RAW_FRAMES[-1])
+
+
+def test_FrameBatch_truncated():
+    with pytest.raises(ValueError, match="Frame 1 at offset"):
+        FrameBatch.from_frames([RAW_FRAMES[0], RAW_FRAMES[0][:14]])
+
+
+def test_FrameBatch_to_numpy():
+    numpy = pytest.importorskip("numpy")
+    columns = FrameBatch.from_frames(RAW_FRAMES).to_numpy()
+    assert list(columns["destination"]) == [b"APRS", b"APZ069", b"APRS"]
+    assert columns["path_length"].dtype == numpy.uint8
+    assert list(columns["pid"]) == [0xF0, 0xF0, -1]
+
+
+def test_FrameBatch_from_capture():
+    capture = (
+        b"~\x82\xa0\xa4\xa6@@`\x9c`\x86\x82\x98\x98`\xae\x92\x88\x8ab@c\x03\xf0"
+        b"foo bar baz`\xa9~"
+        b"~\x82\xa0\xa4\xa6@@`\x9c`\x86\x82\x98\x98`\xae\x92\x88\x8ab@c\x03\xf0"
+        b"foo bar baz`\xa8~"
+    )
+    batch = FrameBatch.from_capture(capture)
+    assert list(batch) == [Frame.from_bytes(RAW_FRAMES[0])]
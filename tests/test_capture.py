@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from ax253 import CaptureReader, Frame, LazyFrame
+from ax253.frame import ErrorPolicy, FrameError
+
+from conftest import flagged
+
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+FRAMES = [
+    Frame.ui("APRS", "N0CALL-{}".format(i), ["WIDE1-1"], info="packet {}".format(i))
+    for i in range(5)
+]
+
+
+def test_capture_ax25(tmp_path):
+    path = tmp_path / "capture.ax25"
+    path.write_bytes(b"".join(flagged(f) for f in FRAMES) + b"~\x82\xa0")
+    with CaptureReader(str(path)) as reader:
+        frames = list(reader)
+        assert all(isinstance(f, LazyFrame) for f in frames)
+        assert frames == FRAMES
+        # the unterminated frame at the end is left for later
+        assert reader.tell() == len(reader) - 4
+        frame_size = len(flagged(FRAMES[0]))
+        # seeking into the middle of a frame resumes at the next one
+        reader.seek(frame_size * 2 + 5)
+        assert list(reader) == FRAMES[3:]
+        assert reader.seek(-frame_size - 3, os.SEEK_END) == 4 * frame_size
+        assert list(reader) == FRAMES[4:]
+        with path.open("ab") as f:
+            f.write(b"~")
+            f.write(flagged(FRAMES[0]))
+        reader.reload()
+        assert list(reader) == FRAMES[:1]
+
+
+def test_capture_ax25_bad_fcs(tmp_path):
+    path = tmp_path / "capture.ax25"
+    path.write_bytes(flagged(FRAMES[0])[:-2] + b"\x00~" + flagged(FRAMES[1]))
+    with CaptureReader(str(path), lazy=False) as reader:
+        reader.decoder.error_policy = ErrorPolicy.RECORD
+        error, frame = list(reader)
+        assert isinstance(error, FrameError)
+        assert type(frame) is Frame and frame == FRAMES[1]
+        assert reader.decoder.stats.bad_fcs == 1
+
+
+def test_capture_tnc2(tmp_path):
+    path = tmp_path / "capture.tnc2"
+    lines = ["{}".format(f).encode("latin1") for f in FRAMES]
+    path.write_bytes(b"\r\n".join(lines[:3]) + b"\n# comment\r" + lines[3] + b"\r\n")
+    with CaptureReader(str(path), format="tnc2") as reader:
+        assert list(reader) == FRAMES[:4]
+        assert reader.tell() == len(reader)
+        reader.seek(len(lines[0]) + 4)
+        assert list(reader) == FRAMES[2:4]
+
+
+def test_capture_empty(tmp_path):
+    path = tmp_path / "empty"
+    path.write_bytes(b"")
+    with CaptureReader(str(path)) as reader:
+        assert list(reader) == []
+    with pytest.raises(ValueError):
+        CaptureReader(str(path), format="kiss")
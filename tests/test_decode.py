@@ -0,0 +1,345 @@
+import asyncio
+import concurrent.futures
+import socket
+import time
+from typing import Any, Dict, Optional
+
+from attrs import define, field
+import pytest
+
+from ax253 import (
+    AX25BytestreamDecoder,
+    Frame,
+    FrameDecodeProtocol,
+    GenericDecoder,
+    SyncFrameDecode,
+    TNC2Protocol,
+)
+from ax253.decode import OverflowPolicy
+
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+class FakeTransport(asyncio.Transport):
+    def __init__(self):
+        super().__init__()
+        self.paused = False
+        self.closing = False
+        self.written = []
+        self.limits = None
+
+    def pause_reading(self):
+        self.paused = True
+
+    def resume_reading(self):
+        self.paused = False
+
+    def is_closing(self):
+        return self.closing
+
+    def write(self, data):
+        self.written.append(bytes(data))
+
+    def set_write_buffer_limits(self, high=None, low=None):
+        self.limits = (high, low)
+
+    def abort(self):
+        self.closing = True
+
+
+def run(coro_fn, **protocol_kwargs):
+    async def _():
+        protocol = FrameDecodeProtocol(decoder=GenericDecoder(), **protocol_kwargs)
+        protocol.connection_made(FakeTransport())
+        return await coro_fn(protocol)
+
+    return asyncio.run(_())
+
+
+def test_queue_pause_resume():
+    async def _(protocol):
+        for i in range(4):
+            protocol.data_received(bytes([i]))
+        assert protocol.transport.paused
+        assert protocol.queue_stats.pauses == 1
+        frames = [f async for f in protocol.read(n_frames=2)]
+        assert frames == [b"\x00", b"\x01"]
+        assert protocol.transport.paused
+        # resumes once the queue drains to half of max_queue_size
+        assert [f async for f in protocol.read(n_frames=1)] == [b"\x02"]
+        assert not protocol.transport.paused
+        return protocol.queue_stats
+
+    stats = run(_, max_queue_size=3)
+    assert stats.high_water_mark == 4
+    assert stats.dropped == 0
+
+
+@pytest.mark.parametrize(
+    "policy, exp_frames",
+    (
+        (OverflowPolicy.DROP_OLDEST, [b"\x02", b"\x03", b"\x04"]),
+        (OverflowPolicy.DROP_NEWEST, [b"\x00", b"\x01", b"\x02"]),
+    ),
+)
+def test_queue_drop(policy, exp_frames):
+    async def _(protocol):
+        for i in range(5):
+            protocol.data_received(bytes([i]))
+        protocol.connection_lost(None)
+        assert not protocol.transport.paused
+        assert protocol.queue_stats.dropped == 2
+        assert protocol.queue_stats.high_water_mark == 3
+        return [f async for f in protocol.read()]
+
+    assert run(_, max_queue_size=3, overflow_policy=policy.value) == exp_frames
+
+
+def test_read_batch():
+    async def _(protocol):
+        assert await protocol.read_batch(timeout=0.01) == []
+        for i in range(5):
+            protocol.data_received(bytes([i]))
+        assert await protocol.read_batch(max_frames=2) == [b"\x00", b"\x01"]
+        asyncio.get_running_loop().call_soon(protocol.connection_lost, None)
+        batches = [b async for b in protocol.iter_batches()]
+        assert await protocol.read_batch() == []
+        assert [f async for f in protocol.read()] == []
+        return batches
+
+    assert run(_) == [[b"\x02", b"\x03", b"\x04"]]
+
+
+def test_iter_batches_waits():
+    async def _(protocol):
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.01, protocol.data_received, b"a")
+        loop.call_later(0.02, protocol.data_received, b"b")
+        loop.call_later(0.02, protocol.data_received, b"c")
+        loop.call_later(0.03, protocol.connection_lost, None)
+        return [b async for b in protocol.iter_batches()]
+
+    assert run(_) == [[b"a"], [b"b", b"c"]]
+
+
+@pytest.mark.parametrize("batch_callbacks", (False, True))
+def test_push_only(batch_callbacks):
+    received = []
+
+    async def _(protocol):
+        assert protocol.frames is None
+        protocol.data_received(b"a")
+        protocol.data_received(b"b")
+        protocol.connection_lost(None)
+        with pytest.raises(RuntimeError, match="push_only"):
+            await protocol.read_batch()
+
+    run(
+        _,
+        push_only=True,
+        batch_callbacks=batch_callbacks,
+        callbacks=[received.append],
+    )
+    if batch_callbacks:
+        assert received == [[b"a"], [b"b"]]
+    else:
+        assert received == [b"a", b"b"]
+
+
+def test_write_many():
+    async def _(protocol):
+        protocol.write(b"a")
+        protocol.write_many([b"b", b"c"])
+        return protocol.transport.written
+
+    assert run(_) == [b"a", b"bc"]
+
+
+def test_coalesce_writes():
+    async def _(protocol):
+        assert protocol.transport.limits == (1024, 256)
+        protocol.write(b"a")
+        protocol.write_many([b"b", b"c"])
+        assert protocol.transport.written == []
+        await asyncio.sleep(0)
+        assert protocol.transport.written == [b"abc"]
+        protocol.pause_writing()
+        protocol.write(b"d")
+        await asyncio.sleep(0)
+        assert protocol.transport.written == [b"abc"]
+        drained = asyncio.ensure_future(protocol.drain())
+        await asyncio.sleep(0)
+        assert not drained.done()
+        protocol.resume_writing()
+        await drained
+        return protocol.transport.written
+
+    written = run(_, coalesce_writes=True, write_high_water=1024, write_low_water=256)
+    assert written == [b"abc", b"d"]
+
+
+@pytest.mark.parametrize(
+    "executor_class",
+    (concurrent.futures.ThreadPoolExecutor, concurrent.futures.ProcessPoolExecutor),
+)
+def test_executor_offload(executor_class):
+    frame = (
+        b"~\x82\xa0\xa4\xa6@@`\x9c`\x86\x82\x98\x98`\xae\x92\x88\x8ab@c\x03\xf0"
+        b"foo bar baz`\xa9~"
+    )
+    stream = frame * 20
+
+    async def _():
+        protocol = FrameDecodeProtocol(
+            decoder=AX25BytestreamDecoder(), executor=executor
+        )
+        protocol.connection_made(FakeTransport())
+        for i in range(0, len(stream), 7):
+            protocol.data_received(stream[i : i + 7])
+        protocol.connection_lost(None)
+        return [f async for f in protocol.read()]
+
+    with executor_class(max_workers=2) as executor:
+        frames = asyncio.run(_())
+    assert [f.info for f in frames] == [b"foo bar baz"] * 20
+
+
+@pytest.mark.parametrize("use_executor", (False, True))
+def test_decoder_error_ends_connection(use_executor):
+    good = (
+        b"~\x82\xa0\xa4\xa6@@`\x9c`\x86\x82\x98\x98`\xae\x92\x88\x8ab@c\x03\xf0"
+        b"foo bar baz`\xa9~"
+    )
+    bad = good[:-2] + b"\xa8~"
+
+    async def _():
+        protocol = FrameDecodeProtocol(
+            decoder=AX25BytestreamDecoder(),
+            executor=executor if use_executor else None,
+        )
+        protocol.connection_made(FakeTransport())
+        try:
+            protocol.data_received(good + bad)
+        except ValueError:
+            # asyncio closes the transport when data_received raises
+            protocol.transport.abort()
+        if not protocol.transport.closing:
+            protocol.data_received(good)
+        for _ in range(500):
+            if protocol.transport.closing:
+                break
+            await asyncio.sleep(0.01)
+        assert protocol.transport.closing
+        protocol.connection_lost(None)
+        return [f.info for f in await asyncio.wait_for(protocol.read_batch(), 5)]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        assert asyncio.run(_()) == [b"foo bar baz"]
+
+
+def test_executor_failure():
+    async def _():
+        protocol = FrameDecodeProtocol(decoder=GenericDecoder(), executor=executor)
+        protocol.connection_made(FakeTransport())
+        protocol.data_received(b"a")
+        protocol.connection_lost(None)
+        return await asyncio.wait_for(protocol.read_batch(), 5)
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    executor.shutdown()
+    assert asyncio.run(_()) == []
+
+
+def test_connection_lost_queues_eof_after_flush_error():
+    async def _():
+        protocol = FrameDecodeProtocol(decoder=AX25BytestreamDecoder())
+        protocol.connection_made(FakeTransport())
+        protocol.data_received(b"~" + frame + b"~\x82\xa0")
+        with pytest.raises(ValueError):
+            protocol.connection_lost(None)
+        return [f async for f in protocol.read()]
+
+    frame = (
+        b"\x82\xa0\xa4\xa6@@`\x9c`\x86\x82\x98\x98`\xae\x92\x88\x8ab@c\x03\xf0"
+        b"foo bar baz`\xa9"
+    )
+    assert [f.info for f in asyncio.run(_())] == [b"foo bar baz"]
+
+
+@define
+class SocketPairDecode(SyncFrameDecode):
+    peer: Optional[socket.socket] = None
+    protocol_kwargs: Dict[str, Any] = field(factory=dict)
+
+    def start(self):
+        ours, self.peer = socket.socketpair()
+        _, self.protocol = self.run(
+            self.loop.create_connection(
+                lambda: TNC2Protocol(**self.protocol_kwargs), sock=ours
+            )
+        )
+
+    def stop(self):
+        if self._protocol is not None:
+            self.run(self._close(self._protocol.transport))
+            self._protocol = None
+
+    @staticmethod
+    async def _close(transport):
+        transport.close()
+
+
+@pytest.mark.parametrize("threaded", (False, True))
+def test_sync_read(threaded):
+    with SocketPairDecode(threaded=threaded) as tnc2, SocketPairDecode(
+        threaded=threaded
+    ) as other:
+        assert tnc2.read(min_frames=1, timeout=0.01) == []
+        tnc2.peer.send(b"A>APRS:1\r\nA>APRS:2\r\n")
+        other.peer.send(b"B>APRS:1\r\n")
+        assert [str(f) for f in tnc2.read(min_frames=2, timeout=5)] == [
+            "A>APRS:1",
+            "A>APRS:2",
+        ]
+        assert [str(f) for f in other.read(min_frames=1, timeout=5)] == ["B>APRS:1"]
+        tnc2.peer.send(b"A>APRS:3\r\n")
+        tnc2.peer.close()
+        assert [str(f) for f in tnc2] == ["A>APRS:3"]
+        assert tnc2.read(min_frames=None) == []
+
+
+@pytest.mark.parametrize("coalesce_writes", (False, True))
+def test_sync_write_threaded(coalesce_writes):
+    with SocketPairDecode(threaded=True) as tnc2:
+        tnc2.protocol.coalesce_writes = coalesce_writes
+        tnc2.peer.settimeout(5)
+        tnc2.write(Frame.from_str("A>APRS:1"))
+        tnc2.write_many(Frame.from_str("A>APRS:{}".format(n)) for n in (2, 3))
+        received = b""
+        while received.count(b"\r\n") < 3:
+            received += tnc2.peer.recv(1024)
+        assert received == b"A>APRS:1\r\nA>APRS:2\r\nA>APRS:3\r\n"
+
+
+@pytest.mark.parametrize("policy", ("pause", "drop_oldest"))
+def test_sync_read_threaded_bounded(policy):
+    lines = [b"A>APRS:%d\r\n" % n for n in range(200)]
+    with SocketPairDecode(
+        threaded=True,
+        protocol_kwargs=dict(max_queue_size=4, overflow_policy=policy),
+    ) as tnc2:
+        tnc2.peer.sendall(b"".join(lines))
+        tnc2.peer.close()
+        if policy == "pause":
+            deadline = time.monotonic() + 5
+            while not tnc2.protocol.queue_stats.pauses:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+        frames = [str(f) for f in tnc2.read(min_frames=None, timeout=5)]
+    if policy == "pause":
+        assert frames == [line.decode()[:-2] for line in lines]
+    else:
+        assert frames
@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from ax253 import fcs as fcs_module
+from ax253.fcs import FCS
+
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+FRAME = (
+    b"\x82\xa0\xa4\xa6@@`\x9c`\x86\x82\x98\x98`\xae\x92\x88\x8ab@c\x03\xf0foo bar baz"
+)
+FRAME_FCS = b"`\xa9"
+
+
+@pytest.fixture(params=list(fcs_module.BACKENDS), autouse=True)
+def backend(request):
+    previous = fcs_module.BACKEND
+    yield fcs_module.select_backend(request.param)
+    fcs_module.select_backend(previous)
+
+
+def bitwise_digest(data):
+    fcs = FCS()
+    for byte in data:
+        for i in range(7, -1, -1):
+            fcs.update_bit((byte >> i) & 0x01 == 1)
+    return fcs.digest()
+
+
+@pytest.mark.parametrize(
+    "data",
+    (b"", b"\x00", b"123456789", FRAME, os.urandom(512)),
+    ids=["empty", "zero", "check", "frame", "random"],
+)
+def test_fcs_matches_bitwise(data):
+    exp = bitwise_digest(data)
+    assert FCS.compute(data) == exp
+    assert FCS.compute(bytearray(data)) == exp
+    assert FCS.compute(memoryview(data)) == exp
+    assert FCS.from_bytes(data).digest() == exp
+
+
+def test_fcs_streaming():
+    fcs = FCS()
+    for i in range(0, len(FRAME), 5):
+        fcs.update(memoryview(FRAME)[i : i + 5])
+    assert fcs.digest() == FCS.compute(FRAME) == FRAME_FCS
+
+
+def test_fcs_verify():
+    assert FCS.verify(FRAME + FRAME_FCS)
+    assert FCS.verify(memoryview(bytearray(FRAME + FRAME_FCS)))
+    assert not FCS.verify(FRAME + b"`\xa8")
+    assert not FCS.verify(b"`")
+
+
+def test_fcs_backend_env(monkeypatch, backend):
+    monkeypatch.setenv(fcs_module.BACKEND_ENV_VAR, "table")
+    assert fcs_module.select_backend() == "table"
+    assert fcs_module.BACKEND == "table"
+    monkeypatch.setenv(fcs_module.BACKEND_ENV_VAR, "bogus")
+    with pytest.raises(ValueError, match="Unknown FCS backend"):
+        fcs_module.select_backend()
+
+
+def test_fcs_verify_spans():
+    buffer = FRAME + FRAME_FCS + b"~" + FRAME + b"`\xa8" + b"~`"
+    n = len(FRAME) + 2
+    starts = [0, n + 1, 2 * n + 2]
+    ends = [n, 2 * n + 1, 2 * n + 3]
+    assert FCS.verify_spans(buffer, starts, ends) == [True, False, False]
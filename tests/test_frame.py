@@ -1,6 +1,14 @@
+import attr
 import pytest
 
-from ax253 import Address, AX25BytestreamDecoder, Control, Frame
+from ax253 import Address, AX25BytestreamDecoder, Control, Frame, FrameType, LazyFrame
+from ax253.frame import (
+    DecoderStats,
+    ErrorPolicy,
+    find_frame_spans,
+    FrameError,
+    valid_frame_spans,
+)
 
 
 __author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
@@ -257,3 +265,199 @@ def test_AX25BytestreamDecoder(chunks, exp_frames, exp_exception):
             raise
         assert exp_exception in str(exc)
     assert decoded_frames == exp_frames
+
+
+@pytest.mark.parametrize("chunk_size", (1, 2, 7, 64, 65536))
+def test_AX25BytestreamDecoder_chunking(chunk_size):
+    stream = (
+        b"~\x82\xa0\xa4\xa6@@`\x9c`\x86\x82\x98\x98`\xae\x92\x88\x8ab@c\x03\xf0"
+        b"foo bar baz`\xa9~"
+        b"~~~~~\x82\xa0\xb4`lr`\x9c`\x86\x82\x98\x98`\xae\x92\x88\x8ab@b\x8c\x9e\x9e"
+        b"\x88\xa0@\xe1\x03\xf0digi'd 1\xcf\xcc~"
+    ) * 3
+    d = AX25BytestreamDecoder()
+    decoded_frames = []
+    for i in range(0, len(stream), chunk_size):
+        decoded_frames.extend(d.update(stream[i : i + chunk_size]))
+    decoded_frames.extend(d.flush())
+    assert [f.info for f in decoded_frames] == [b"foo bar baz", b"digi'd 1"] * 3
+
+
+@pytest.mark.parametrize(
+    "ax25_bytes",
+    (
+        (
+            b"\x82\xa0\xa4\xa6@@`\x9c`\x86\x82\x98\x98`\xae\x92\x88\x8ab@c\x03\xf0"
+            b"foo bar baz"
+        ),
+        (
+            b"\x82\xa0\xb4`lr`\x9c`\x86\x82\x98\x98`\xae\x92\x88\x8ab@b\x8c\x9e\x9e"
+            b"\x88\xa0@\xe1\x03\xf0digi'd 1"
+        ),
+        b"\x82\xa0\xa4\xa6@@`\x9c`\x86\x82\x98\x98a\x43",
+    ),
+    ids=["ui", "digipeated", "u frame"],
+)
+def test_LazyFrame(ax25_bytes):
+    lazy = Frame.from_bytes(ax25_bytes, lazy=True)
+    assert isinstance(lazy, LazyFrame)
+    assert bytes(lazy) is ax25_bytes
+    frame = Frame.from_bytes(ax25_bytes)
+    assert lazy.source == frame.source
+    assert lazy.info == frame.info
+    assert lazy.pid == frame.pid
+    assert lazy.to_frame() == frame
+    assert lazy == frame
+    assert str(lazy) == str(frame)
+
+
+def test_LazyFrame_copies_mutable_buffer():
+    buf = bytearray(b"\x82\xa0\xa4\xa6@@`\x9c`\x86\x82\x98\x98a\x03\xf0foo")
+    lazy = LazyFrame(memoryview(buf))
+    buf[-3:] = b"bar"
+    assert lazy.info == b"foo"
+
+
+def test_AX25BytestreamDecoder_lazy():
+    d = AX25BytestreamDecoder(lazy=True)
+    (frame,) = d.update(
+        b"~\x82\xa0\xa4\xa6@@`\x9c`\x86\x82\x98\x98`\xae\x92\x88\x8ab@c\x03\xf0"
+        b"foo bar baz`\xa9~"
+    )
+    assert isinstance(frame, LazyFrame)
+    assert str(frame) == "N0CALL>APRS,WIDE1-1:foo bar baz"
+
+
+def test_Frame_encoding_cached():
+    frame = Frame.ui(destination="APRS", source="N0CALL", path=["WIDE1-1"], info="foo")
+    assert bytes(frame) is bytes(frame)
+    assert str(frame) is str(frame)
+    assert Frame.from_bytes(bytes(frame)) == frame
+    assert str(attr.evolve(frame, info=b"bar")) == "N0CALL>APRS,WIDE1-1:bar"
+
+
+@pytest.mark.parametrize(
+    "control, exp_ftype",
+    (
+        (0x03, FrameType.U_UI),
+        (0x13, FrameType.U_UI),
+        (0x01, FrameType.S_RR),
+        (0x10, FrameType.I),
+    ),
+)
+def test_Control_decoded_fields(control, exp_ftype):
+    c = Control.from_any(control)
+    assert c is Control.from_any(bytes([control]))
+    assert c == Control(bytes([control]))
+    assert c.ftype is FrameType.from_control_byte(control) is exp_ftype
+    assert (c.n_r, c.n_s) == (control >> 5, (control & 0x0F) >> 1)
+
+
+def test_FrameType_bad_control_byte():
+    with pytest.raises(ValueError, match="control byte 256"):
+        FrameType.from_control_byte(256)
+
+
+@pytest.mark.parametrize("use_numpy", (False, True), ids=["re", "numpy"])
+def test_find_frame_spans(use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    data = b"ab~~~cde~f~~"
+    starts, ends = find_frame_spans(data, use_numpy=use_numpy)
+    assert list(zip(starts, ends)) == [(0, 2), (5, 8), (9, 10)]
+    starts, ends = find_frame_spans(memoryview(bytearray(b"~x")), use_numpy=use_numpy)
+    assert list(zip(starts, ends)) == [(1, 2)]
+
+
+def test_AX25BytestreamDecoder_update_bulk():
+    good = (
+        b"\x82\xa0\xa4\xa6@@`\x9c`\x86\x82\x98\x98`\xae\x92\x88\x8ab@c\x03\xf0"
+        b"foo bar baz`\xa9"
+    )
+    stream = (b"~~" + good) * 4 + b"~" + good[:10]
+    d = AX25BytestreamDecoder()
+    frames = list(d.update_bulk(stream))
+    assert len(frames) == 4
+    # the partial frame is completed by a regular update
+    frames.extend(d.update(good[10:] + b"~"))
+    assert frames == [Frame.from_bytes(good[:-2])] * 5
+    starts, ends = valid_frame_spans(stream, *find_frame_spans(stream))
+    assert len(starts) == 4
+    assert all(stream[e : e + 2] == good[-2:] for e in ends)
+    with pytest.raises(ValueError, match="FCS did not match"):
+        list(d.update_bulk(b"~" + good[:-1] + b"\x00~"))
+
+
+GOOD_FRAME = (
+    b"\x82\xa0\xa4\xa6@@`\x9c`\x86\x82\x98\x98`\xae\x92\x88\x8ab@c\x03\xf0foo bar baz"
+    b"`\xa9"
+)
+BAD_FCS_FRAME = GOOD_FRAME[:-1] + b"\xa8"
+
+
+@pytest.mark.parametrize("bulk", (False, True), ids=["update", "update_bulk"])
+@pytest.mark.parametrize("chunk_size", (1, 5, 4096))
+def test_AX25BytestreamDecoder_error_policy(bulk, chunk_size):
+    stream = b"~".join(
+        [b"", GOOD_FRAME, BAD_FCS_FRAME, b"runt", b"\x00" * 100, GOOD_FRAME, b""]
+    )
+    d = AX25BytestreamDecoder(error_policy="record", max_frame_length=64)
+    update = d.update_bulk if bulk else d.update
+    decoded = []
+    for i in range(0, len(stream), chunk_size):
+        decoded.extend(update(stream[i : i + chunk_size]))
+    assert [getattr(f, "reason", "frame") for f in decoded] == [
+        "frame",
+        "bad_fcs",
+        "runt",
+        "oversize",
+        "frame",
+    ]
+    assert isinstance(decoded[1], FrameError)
+    assert decoded[1].data == BAD_FCS_FRAME
+    assert d.stats == DecoderStats(frames=2, bad_fcs=1, runts=1, oversize=1)
+
+
+def test_AX25BytestreamDecoder_raise_resumes():
+    d = AX25BytestreamDecoder()
+    with pytest.raises(ValueError, match="FCS did not match"):
+        list(d.update(b"~" + BAD_FCS_FRAME + b"~" + GOOD_FRAME + b"~"))
+    assert list(d.update(b"")) == [Frame.from_bytes(GOOD_FRAME[:-2])]
+    assert d.stats.bad_fcs == 1
+
+
+def test_AX25BytestreamDecoder_drop():
+    d = AX25BytestreamDecoder(error_policy=ErrorPolicy.DROP)
+    frames = list(d.update(b"~" + BAD_FCS_FRAME + b"~~" + GOOD_FRAME + b"~"))
+    assert frames == [Frame.from_bytes(GOOD_FRAME[:-2])]
+
+
+@pytest.mark.parametrize(
+    "tail, exp_frames, exp_stats",
+    (
+        (GOOD_FRAME, [Frame.from_bytes(GOOD_FRAME[:-2])], DecoderStats(frames=2)),
+        (GOOD_FRAME[:-2], [], DecoderStats(frames=1, runts=1)),
+        (GOOD_FRAME[:10], [], DecoderStats(frames=1, runts=1)),
+    ),
+    ids=["fcs", "no fcs", "truncated"],
+)
+def test_AX25BytestreamDecoder_flush_unterminated(tail, exp_frames, exp_stats):
+    d = AX25BytestreamDecoder(error_policy=ErrorPolicy.DROP)
+    assert len(list(d.update(b"~" + GOOD_FRAME + b"~" + tail))) == 1
+    assert list(d.flush()) == exp_frames
+    assert d.stats == exp_stats
+
+
+@pytest.mark.parametrize("bulk", (False, True), ids=["update", "update_bulk"])
+def test_AX25BytestreamDecoder_partly_consumed(bulk):
+    d = AX25BytestreamDecoder(max_frame_length=64)
+    update = d.update_bulk if bulk else d.update
+    stream = b"~" + GOOD_FRAME + b"~"
+    pending = update(stream * 2)
+    assert next(iter(pending)) == Frame.from_bytes(GOOD_FRAME[:-2])
+    # the next update resumes with the frame the first one didn't reach
+    assert list(update(stream)) == [Frame.from_bytes(GOOD_FRAME[:-2])] * 2
+    oversize = update(b"\x82" * 100)
+    with pytest.raises(ValueError, match="max_frame_length"):
+        next(iter(oversize))
+    assert list(update(stream)) == [Frame.from_bytes(GOOD_FRAME[:-2])]
@@ -0,0 +1,102 @@
+import asyncio
+import socket
+
+from ax253 import Frame, FrameHub, TNC2Protocol
+
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+def socketpair_link(peers, fail_first=0):
+    """Connect factory over a socketpair; the far ends are appended to peers."""
+    attempts = []
+
+    async def connect():
+        attempts.append(None)
+        if len(attempts) <= fail_first:
+            raise ConnectionRefusedError("try again")
+        ours, theirs = socket.socketpair()
+        theirs.setblocking(False)
+        peers.append(theirs)
+        return await asyncio.get_running_loop().create_connection(
+            TNC2Protocol, sock=ours
+        )
+
+    return connect
+
+
+def test_hub_fan_in_fan_out():
+    async def _():
+        peers_a, peers_b = [], []
+        hub = FrameHub(max_batch=2, reconnect_delay=0.01)
+        hub.add_link("a", socketpair_link(peers_a))
+        hub.add_link("b", socketpair_link(peers_b, fail_first=1))
+        async with hub:
+            while not (hub.links["a"].connected and hub.links["b"].connected):
+                await asyncio.sleep(0.01)
+            peers_a[0].send(b"A>APRS:1\r\nA>APRS:2\r\nA>APRS:3\r\n")
+            peers_b[0].send(b"B>APRS:1\r\n")
+            received = []
+            async for link_frame in hub.read():
+                received.append((link_frame.link, str(link_frame.frame)))
+                if len(received) == 4:
+                    break
+            assert hub.write(Frame.from_str("C>APRS:out"), links=["b"]) == 1
+            await asyncio.sleep(0.01)
+            assert peers_b[0].recv(100) == b"C>APRS:out\r\n"
+            # link a is reconnected after it is closed from the far side
+            peers_a[0].close()
+            while len(peers_a) < 2 or not hub.links["a"].connected:
+                await asyncio.sleep(0.01)
+        for peer in peers_a + peers_b:
+            peer.close()
+        return hub, received
+
+    hub, received = asyncio.run(_())
+    assert sorted(received) == [
+        ("a", "A>APRS:1"),
+        ("a", "A>APRS:2"),
+        ("a", "A>APRS:3"),
+        ("b", "B>APRS:1"),
+    ]
+    assert [f for link, f in received if link == "a"] == [
+        "A>APRS:1",
+        "A>APRS:2",
+        "A>APRS:3",
+    ]
+    assert hub.links["a"].stats.connects == 2
+    assert hub.links["a"].stats.frames_in == 3
+    assert hub.links["b"].stats.failures == 1
+    assert hub.links["b"].stats.frames_out == 1
+
+
+def test_hub_backpressure_and_close():
+    async def _():
+        peers = []
+        hub = FrameHub(max_batch=2, max_queue_size=2, reconnect_delay=0.01)
+        hub.add_link("a", socketpair_link(peers))
+        await hub.start()
+        while not hub.links["a"].connected:
+            await asyncio.sleep(0.01)
+        peers[0].send(b"".join(b"A>APRS:%d\r\n" % n for n in range(10)))
+        protocol = hub.links["a"].protocol
+        while not protocol.queue_stats.pauses:
+            await asyncio.sleep(0.01)
+        received = []
+        async for link_frame in hub.read():
+            received.append(str(link_frame.frame))
+            if len(received) == 10:
+                break
+        reader = asyncio.ensure_future(hub.read().__anext__())
+        await asyncio.sleep(0.01)
+        await hub.close()
+        try:
+            await asyncio.wait_for(reader, 1)
+        except StopAsyncIteration:
+            pass
+        peers[0].close()
+        return received
+
+    assert asyncio.run(_()) == ["A>APRS:{}".format(n) for n in range(10)]
@@ -0,0 +1,100 @@
+import collections
+import concurrent.futures
+
+import pytest
+
+from ax253 import Frame
+from ax253.frame import ErrorPolicy, FrameError
+from ax253.parallel import decode_capture, split_capture, summarize_capture
+
+from conftest import flagged
+
+
+__author__ = "Masen Furer KF7HVM <kf7hvm@0x26.net>"
+__copyright__ = "Copyright 2022 Masen Furer and Contributors"
+__license__ = "Apache License, Version 2.0"
+
+
+FRAMES = [
+    Frame.ui("APRS", "N{}CALL".format(i % 3), ["WIDE1-1"], info="packet {}".format(i))
+    for i in range(60)
+]
+# the capture has no bit stuffing, so flags must not appear inside a frame
+FRAMES = [f for f in FRAMES if b"~" not in flagged(f)[1:-1]][:50]
+
+
+@pytest.fixture
+def ax25_capture(tmp_path):
+    path = tmp_path / "capture.ax25"
+    path.write_bytes(b"".join(flagged(f) for f in FRAMES))
+    return str(path)
+
+
+@pytest.fixture
+def tnc2_capture(tmp_path):
+    path = tmp_path / "capture.tnc2"
+    path.write_bytes(b"".join("{}\r\n".format(f).encode("latin1") for f in FRAMES))
+    return str(path)
+
+
+def test_split_capture(ax25_capture, tnc2_capture):
+    spans = split_capture(ax25_capture, chunk_size=100)
+    assert len(spans) > 10
+    for (_, end), (start, _) in zip(spans, spans[1:]):
+        # the flag between two ranges is shared
+        assert start == end - 1
+    spans = split_capture(tnc2_capture, "tnc2", chunk_size=100)
+    with open(tnc2_capture, "rb") as f:
+        data = f.read()
+    assert b"".join(data[start:end] for start, end in spans) == data
+    assert all(data[end - 1 : end] == b"\n" for _, end in spans)
+
+
+@pytest.mark.parametrize("chunk_size", (30, 100, 10000))
+def test_decode_capture(ax25_capture, tnc2_capture, chunk_size):
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        for path, format in ((ax25_capture, "ax25"), (tnc2_capture, "tnc2")):
+            frames = decode_capture(
+                path, format, chunk_size=chunk_size, executor=executor
+            )
+            assert list(frames) == FRAMES
+
+
+def test_decode_capture_processes(ax25_capture):
+    assert list(decode_capture(ax25_capture, workers=2, chunk_size=500)) == FRAMES
+
+
+def test_summarize_capture(ax25_capture, tnc2_capture):
+    with open(ax25_capture, "ab") as f:
+        f.write(b"\x82\xa0" * 10 + b"~")
+    summary = summarize_capture(
+        ax25_capture, workers=2, chunk_size=500, error_policy=ErrorPolicy.DROP
+    )
+    assert summary.frames == 50
+    assert summary.stats.frames == 50
+    assert summary.stats.bad_fcs == 1
+    assert summary.sources == collections.Counter(str(f.source) for f in FRAMES)
+    assert summary.destinations == {"APRS": 50}
+    assert summarize_capture(tnc2_capture, "tnc2", chunk_size=100).frames == 50
+
+
+def test_decode_capture_errors(ax25_capture):
+    with open(ax25_capture, "ab") as f:
+        f.write(b"\x82\xa0" * 10 + b"~")
+    with pytest.raises(ValueError):
+        list(decode_capture(ax25_capture, workers=1))
+    frames = list(
+        decode_capture(ax25_capture, workers=1, error_policy=ErrorPolicy.RECORD)
+    )
+    assert frames[:-1] == FRAMES
+    assert isinstance(frames[-1], FrameError)
+
+
+@pytest.mark.parametrize("error_policy", ("raise", "drop"))
+def test_decode_capture_unterminated(ax25_capture, error_policy):
+    with open(ax25_capture, "ab") as f:
+        f.write(flagged(FRAMES[0])[:-1])
+    frames = decode_capture(
+        ax25_capture, workers=1, chunk_size=500, error_policy=error_policy
+    )
+    assert list(frames) == FRAMES
@@ -1,6 +1,12 @@
 """Test decode CRLF delimited UI packets"""
+import gzip
+import io
+from typing import Any
 
-from ax253 import Address, Frame, TNC2Decode
+from attrs import define, field
+
+from ax253 import Address, Frame, TNC2Decode, TNC2Writer
+from ax253.tnc2 import frame_from_tnc2
 
 import pytest
 
@@ -139,3 +145,124 @@ def test_tnc2_decode(packet_data, exp_frames, exp_exception):
         if exp_exception:
             assert exp_exception in str(exc)
         raise
+
+
+@pytest.mark.parametrize("chunk_size", (1, 7, 64, 4096))
+def test_tnc2_decode_chunked(chunk_size):
+    data = idiotv["frames"]
+    decoder = TNC2Decode()
+    frames = []
+    for i in range(0, len(data), chunk_size):
+        frames.extend(decoder.update(data[i : i + chunk_size]))
+    frames.extend(decoder.flush())
+    assert frames == idiotv["exp"]
+
+
+def test_tnc2_decode_line_endings():
+    decoder = TNC2Decode()
+    frames = list(decoder.update(b"A>B:1\r\nA>B:2\nA>B:3\rA>B:4\r"))
+    frames.extend(decoder.update(b"\nA>B:5"))
+    assert [f.info for f in frames] == [b"1", b"2", b"3", b"4"]
+    assert [f.info for f in decoder.flush()] == [b"5"]
+    assert list(decoder.flush()) == []
+
+
+def test_tnc2_decode_max_line_length():
+    decoder = TNC2Decode(max_line_length=16)
+    frames = list(decoder.update(b"A>B:1\r\nA>B:" + b"x" * 20))
+    frames.extend(decoder.update(b"x" * 20 + b"\r\nA>B:" + b"y" * 20 + b"\r\nA>B:2"))
+    frames.extend(decoder.update(b"\r\n"))
+    assert [f.info for f in frames] == [b"1", b"2"]
+
+
+@pytest.mark.parametrize(
+    "line",
+    (
+        b"N0CALL>APRS:",
+        b"N0CALL-7>APRS,WIDE1-1,WIDE1-1:>status \xb0",
+        b"N0CALL>APRS,N7QXO-9*,WIDE2-1,QAR,KG7ZZA-10::BLN1     :a:b",
+    ),
+)
+def test_frame_from_tnc2(line):
+    frame = frame_from_tnc2(line)
+    assert frame == Frame.from_str(line.decode("latin1"))
+    assert str(frame).encode("latin1") == line
+
+
+def test_repeated_path_hop():
+    # only the final hop ends the address field, even if an earlier one matches it
+    frame = frame_from_tnc2(b"N0CALL>APRS,WIDE1-1,WIDE1-1:test")
+    assert [p.a7_hldc for p in frame.path] == [False, True]
+    assert Frame.from_bytes(bytes(frame)) == frame
+
+
+def test_frame_from_tnc2_invalid():
+    with pytest.raises(ValueError):
+        frame_from_tnc2(b"not a packet")
+    assert list(TNC2Decode().update(b"not a packet\r\nA>B:1\r\n")) == [
+        Frame.ui("B", "A", info=b"1")
+    ]
+
+
+def test_tnc2_writer():
+    sink = io.BytesIO()
+    with TNC2Writer(sink, buffer_size=100) as writer:
+        writer.write(idiotv["exp"][0])
+        assert sink.getvalue() == b""
+        assert writer.write_many(idiotv["exp"][1:]) == 7
+        assert writer.frames_written == 8
+    exp = "".join("{}\r\n".format(f) for f in idiotv["exp"]).encode("latin1")
+    assert sink.getvalue() == exp
+    assert list(TNC2Decode().update(sink.getvalue())) == idiotv["exp"]
+
+
+class Payload:
+    def __init__(self, text):
+        self.text = text
+
+    def __bytes__(self):
+        return self.text.encode("latin1")
+
+
+@define(frozen=True, slots=True)
+class PayloadFrame(Frame):
+    info: Any = field(default=b"")
+
+
+def test_tnc2_writer_info_bytes():
+    frame = PayloadFrame(
+        destination=Address.from_any("APRS"),
+        source=Address.from_any("N0CALL"),
+        path=[],
+        info=Payload(">status"),
+    )
+    sink = io.BytesIO()
+    with TNC2Writer(sink) as writer:
+        writer.write(frame)
+    assert sink.getvalue() == b"N0CALL>APRS:>status\r\n"
+    assert sink.getvalue() == "{}\r\n".format(frame).encode("latin1")
+
+
+@pytest.mark.parametrize("suffix", (".gz", ".zst"))
+def test_tnc2_writer_compression(tmp_path, suffix):
+    if suffix == ".zst":
+        zstandard = pytest.importorskip("zstandard")
+
+        def decompress(data):
+            return (
+                zstandard.ZstdDecompressor()
+                .stream_reader(io.BytesIO(data), read_across_frames=True)
+                .read()
+            )
+
+    else:
+        decompress = gzip.decompress
+    path = tmp_path / ("capture.tnc2" + suffix)
+    with TNC2Writer.open(str(path)) as writer:
+        writer.write_many(idiotv["exp"][:4])
+        writer.flush()
+        writer.write_many(idiotv["exp"][4:])
+    with TNC2Writer.open(str(path), append=True) as writer:
+        writer.write(idiotv["exp"][0])
+    frames = list(TNC2Decode().update(decompress(path.read_bytes())))
+    assert frames == idiotv["exp"] + idiotv["exp"][:1]